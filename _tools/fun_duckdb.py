@@ -0,0 +1,476 @@
+"""
+A Python API over 'scripts/duckdb/2_run_after_pwsh_script_duckdb_in_general.sql'
+
+The downloaded data are ingested into a (persistent) DuckDB database as table `ts_long`
+[TimeStamp, Value, Unit, Parameter, Location, Site, folder, uid], and the queries below
+run in DuckDB (multithreaded). The results come back through Arrow as
+    - 'pandas': pd.DataFrame
+    - 'polars': pl.DataFrame
+    - 'arrow': pa.Table
+
+E.g.:
+    > import _tools.fun_duckdb as fdb
+    > con = fdb.connect('out/df_long.duckdb')
+    > fdb.ingest_csv(con)  # or fdb.ingest_parquet(con)
+    > fdb.summary(con, to='polars')
+    > fdb.ingest_sites(con, fpd.hourly_WU_AQ_iter(site_list, max_workers=8))
+"""
+from pathlib import Path
+from typing import Iterable
+
+import duckdb
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+import _tools.fun_s as fpd
+
+_path_info = Path(__file__).resolve().parents[1] / 'info'
+
+# The aggregate functions allowed in `resample`
+_agg_sql = {
+    'mean': 'avg', 'avg': 'avg', 'sum': 'sum', 'min': 'min', 'max': 'max',
+    'count': 'count', 'median': 'median', 'std': 'stddev_samp',
+    'first': 'first', 'last': 'last',
+}
+
+
+def _ident(s: str) -> str:
+    """Quote an SQL identifier (table/column name)"""
+    return '"' + s.replace('"', '""') + '"'
+
+
+def _literal(s: 'str | Path') -> str:
+    """Quote an SQL string literal"""
+    return "'" + str(s).replace("'", "''") + "'"
+
+
+def _where(folder: 'str | None', *conditions: str) -> str:
+    """The `where` clause for the data from a folder (all the folders if None)"""
+    if folder is not None:
+        conditions = (f'folder = {_literal(folder)}', *conditions)
+    return f"where {' and '.join(conditions)}" if conditions else ''
+
+
+def _fetch(
+        rel: duckdb.DuckDBPyRelation,
+        to: str,
+) -> 'pd.DataFrame | pl.DataFrame | pa.Table':
+    """Fetch a DuckDB relation through Arrow"""
+    tbl = rel.arrow()
+    if to == 'arrow':
+        return tbl
+    if to == 'polars':
+        return pl.from_arrow(tbl)
+    if to == 'pandas':
+        return tbl.to_pandas()
+    raise ValueError(
+        fpd.cp(f"`to` must be 'pandas', 'polars' or 'arrow' (got '{to}')!\n", fg=35)
+    )
+
+
+def connect(
+        database: 'str | Path' = ':memory:',
+        read_only: bool = False,
+        path_info: 'str | Path | None' = None,
+) -> duckdb.DuckDBPyConnection:
+    """
+    Connect to a DuckDB database, with the tables `plates` [Location, Site] and `params`
+    [Parameter, Unit] (re)loaded from 'plate_info.json' & 'param_info.json'
+
+    Parameters
+    ----------
+    database : str | Path, default=':memory:'
+        The DuckDB database file, e.g. 'out/df_long.duckdb' (created if not existing).
+    read_only : bool, default=False
+        Open the database read-only (the info tables are not reloaded then), so that
+        several processes can query the same file.
+    path_info : str | Path | None, default=None
+        The folder of the JSON files. If None, the <info> folder of this project.
+
+    Returns
+    -------
+    duckdb.DuckDBPyConnection
+    """
+    con = duckdb.connect(str(database), read_only=read_only)
+    if read_only:
+        return con
+    path_info = Path(_path_info if path_info is None else path_info)
+    for tbl, file, key, value in [
+        ('plates', 'plate_info.json', 'Location', 'Site'),
+        ('params', 'param_info.json', 'Parameter', 'Unit'),
+    ]:
+        con.execute(f"""
+            create or replace table {tbl} as
+                with kv as (
+                    select json::map(varchar, varchar) as kv
+                    from read_json_objects({_literal(path_info / file)}, format = 'auto')
+                )
+                select
+                    unnest(map_keys(kv)) as {key},
+                    unnest(map_values(kv)) as {value}
+                from kv
+        """)
+    return con
+
+
+def ingest_csv(
+        con: duckdb.DuckDBPyConnection,
+        csv_glob: str = 'out/**/*.csv',
+        table: str = 'ts_long',
+) -> int:
+    """
+    (Re)create a table in the long format from the CSV files saved by ReportRunner
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        The connection from `connect`.
+    csv_glob : str, default='out/**/*.csv'
+        The CSV files, whose parent folder is saved in column [folder].
+    table : str, default='ts_long'
+
+    Returns
+    -------
+    int
+        The number of rows in the table.
+    """
+    con.execute(f"""
+        create or replace table {_ident(table)} as
+            with tmp as (
+                select *
+                from read_csv(
+                    {_literal(csv_glob)},
+                    skip = 11,
+                    types = {{'TimeStamp': 'TIMESTAMP'}},
+                    union_by_name = true,
+                    filename = true
+                )
+            ),
+            cte as (
+                unpivot tmp
+                on columns(* exclude (TimeStamp, filename))
+                into
+                    name ID
+                    value Value
+            ),
+            tmp_long as (
+                select
+                    TimeStamp,
+                    Value,
+                    parse_path(filename, 'system')[-2] as folder,
+                    split_part(ID, '@', -1) as Location,
+                    split_part(ID, '@', 1) as Parameter,
+                    parse_filename(filename, true, 'system') as uid
+                from cte
+            )
+            select
+                t.TimeStamp, t.Value, pa.Unit, t.Parameter, pl.*, t.folder, t.uid
+            from tmp_long t
+            left join plates pl on t.Location = pl.Location
+            left join params pa on t.Parameter = pa.Parameter
+            order by folder, Site, TimeStamp
+    """)
+    return con.table(table).count('*').fetchone()[0]
+
+
+def ingest_parquet(
+        con: duckdb.DuckDBPyConnection,
+        path_dataset: 'str | Path' = 'out/parquet',
+        table: str = 'ts_long',
+) -> int:
+    """
+    (Re)create a table in the long format from the partitioned Parquet dataset saved by
+    'scripts/python/2_run_after_pwsh_script_pd.py' (folder=*/Location=*/year=*)
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        The connection from `connect`.
+    path_dataset : str | Path, default='out/parquet'
+    table : str, default='ts_long'
+
+    Returns
+    -------
+    int
+        The number of rows in the table.
+    """
+    con.execute(f"""
+        create or replace table {_ident(table)} as
+            select
+                TimeStamp, Value, Unit::varchar as Unit, Parameter::varchar as Parameter,
+                Location, Site::varchar as Site, folder, uid::varchar as uid
+            from read_parquet(
+                {_literal(Path(path_dataset) / '**' / '*.parquet')},
+                hive_partitioning = true
+            )
+            order by folder, Site, TimeStamp
+    """)
+    return con.table(table).count('*').fetchone()[0]
+
+
+def ingest_sites(
+        con: duckdb.DuckDBPyConnection,
+        frames: 'Iterable[tuple[str, pd.DataFrame]]',
+        folder: str = 'hWU',
+        table: str = 'wu_long',
+        replace: bool = False,
+) -> int:
+    """
+    Append `(site, frame)` (such as from `fpd.hourly_WU_AQ_iter`) to a table as they come,
+    so a site at a time is in memory
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        The connection from `connect`.
+    frames : Iterable[tuple[str, pd.DataFrame]]
+        The sites and their single-column frames.
+    folder : str, default='hWU'
+        Saved in column [folder], for the queries below (`resample`, `wide`, `ts_info`).
+    table : str, default='wu_long'
+        The table [TimeStamp, Value, Site, folder], created if not existing.
+    replace : bool, default=False
+        Replace the table (otherwise the rows of the sites in `folder` are replaced).
+
+    Returns
+    -------
+    int
+        The number of rows appended.
+    """
+    create = 'create or replace table' if replace else 'create table if not exists'
+    con.execute(f"""
+        {create} {_ident(table)} (
+            TimeStamp timestamp, Value double, Site varchar, folder varchar
+        )
+    """)
+    n = 0
+    for site, df in frames:
+        tmp = fpd._site_long(site, df).assign(folder=folder)
+        con.execute(
+            f'delete from {_ident(table)} where folder = ? and Site = ?', [folder, site]
+        )
+        con.execute(f'insert into {_ident(table)} select * from tmp')
+        n += tmp.shape[0]
+    return n
+
+
+def summary(
+        con: duckdb.DuckDBPyConnection,
+        table: str = 'ts_long',
+        to: str = 'pandas',
+) -> 'pd.DataFrame | pl.DataFrame | pa.Table':
+    """
+    The summary statistics of each [folder, Site] (as in 'out/data_summary.tsv')
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+    table : str, default='ts_long'
+    to : str, default='pandas'
+        'pandas', 'polars' or 'arrow'.
+
+    Returns
+    -------
+    pd.DataFrame | pl.DataFrame | pa.Table
+        Columns ['Location', 'Site', 'folder', 'Unit', 'Start', 'End', 'Mean', 'Std',
+        'Min', 'Time_min', '25%', 'Median', '75%', 'Max', 'Time_max'].
+    """
+    rel = con.sql(f"""
+        select
+            any_value(Location) as Location,
+            Site,
+            folder,
+            any_value(Unit) as Unit,
+            min(TimeStamp) as Start,
+            max(TimeStamp) as End,
+            avg(Value).round(3) as Mean,
+            stddev_samp(Value).round(3) as Std,
+            min(Value).round(3) as Min,
+            arg_min(TimeStamp, Value) as Time_min,
+            quantile_cont(Value, .25).round(3) as "25%",
+            median(Value).round(3) as Median,
+            quantile_cont(Value, .75).round(3) as "75%",
+            max(Value).round(3) as Max,
+            arg_max(TimeStamp, Value) as Time_max
+        from {_ident(table)}
+        group by folder, Site
+        order by folder, Site
+    """)
+    return _fetch(rel, to)
+
+
+def resample(
+        con: duckdb.DuckDBPyConnection,
+        interval: str = '1 day',
+        agg: str = 'mean',
+        offset: str = '0 hours',
+        prop: float = 0.,
+        folder: 'str | None' = None,
+        table: str = 'ts_long',
+        to: str = 'pandas',
+) -> 'pd.DataFrame | pl.DataFrame | pa.Table':
+    """
+    Aggregate the values of each [folder, Site] into time buckets
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+    interval : str, default='1 day'
+        The length of the time buckets, e.g. '1 day', '1 month', '15 minutes'.
+    agg : str, default='mean'
+        One of ['mean', 'sum', 'min', 'max', 'count', 'median', 'std', 'first', 'last'].
+    offset : str, default='0 hours'
+        Subtracted from [TimeStamp] before bucketing. E.g. '10 hours' for the hourly
+        (period-ending) values to daily ones of the day starting at 9 o'clock, as
+        `fpd.hourly_2_daily(..., day_starts_at=9)`.
+    prop : float, default=0.
+        The minimum proportion of the buckets having values (assuming the time step
+        of the site), below which the aggregated value is NULL.
+    folder : str | None, default=None
+        Only the data from this folder. If None, all the folders.
+    table : str, default='ts_long'
+    to : str, default='pandas'
+        'pandas', 'polars' or 'arrow'.
+
+    Returns
+    -------
+    pd.DataFrame | pl.DataFrame | pa.Table
+        Columns ['folder', 'Site', 'Time', 'Value', 'n'], where [Time] is the bucket start.
+    """
+    if (fun := _agg_sql.get(agg)) is None:
+        raise ValueError(
+            fpd.cp(f'`agg` must be one of {list(_agg_sql)} (got {agg!r})!\n', fg=35)
+        )
+    intv, offs = (f'interval {_literal(i)}' for i in (interval, offset))
+    rel = con.sql(f"""
+        with dt as (
+            select
+                folder, Site, Value,
+                time_bucket({intv}, TimeStamp - {offs}) as Time,
+                epoch(TimeStamp - lag(TimeStamp) over (
+                    partition by folder, Site order by TimeStamp
+                )) as d
+            from {_ident(table)}
+            {_where(folder)}
+        ),
+        stp as (
+            select *, min(d) over (partition by folder, Site) as step from dt
+        )
+        select
+            folder,
+            Site,
+            Time,
+            case
+                when count(Value) * coalesce(any_value(step), 0)
+                    >= {float(prop)} * (epoch(Time + {intv}) - epoch(Time))
+                then {fun}(Value)
+            end as Value,
+            count(Value) as n
+        from stp
+        group by folder, Site, Time
+        order by folder, Site, Time
+    """)
+    return _fetch(rel, to)
+
+
+def wide(
+        con: duckdb.DuckDBPyConnection,
+        folder: 'str | None' = None,
+        table: str = 'ts_long',
+        to: str = 'pandas',
+) -> 'pd.DataFrame | pl.DataFrame | pa.Table':
+    """
+    Pivot the values into the wide format - a column for each site
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+    folder : str | None, default=None
+        Only the data from this folder (recommended, as the sites in a folder share
+        `Parameter` & `Unit`). If None, all the folders.
+    table : str, default='ts_long'
+    to : str, default='pandas'
+        'pandas', 'polars' or 'arrow'.
+
+    Returns
+    -------
+    pd.DataFrame | pl.DataFrame | pa.Table
+        Columns ['TimeStamp', *Site] sorted by [TimeStamp]. The gaps in the time
+        steps are not filled (see `fpd.na_ts_insert`).
+    """
+    rel = con.sql(f"""
+        pivot (
+            select TimeStamp, Site, Value from {_ident(table)} {_where(folder)}
+        )
+        on Site
+        using first(Value)
+        group by TimeStamp
+        order by TimeStamp
+    """)
+    return _fetch(rel, to)
+
+
+def ts_info(
+        con: duckdb.DuckDBPyConnection,
+        folder: 'str | None' = None,
+        table: str = 'ts_long',
+        to: str = 'pandas',
+) -> 'pd.DataFrame | pl.DataFrame | pa.Table':
+    """
+    The data availability of each [folder, Site], as `fpd.ts_info`
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+    folder : str | None, default=None
+        Only the data from this folder. If None, all the folders.
+    table : str, default='ts_long'
+    to : str, default='pandas'
+        'pandas', 'polars' or 'arrow'.
+
+    Returns
+    -------
+    pd.DataFrame | pl.DataFrame | pa.Table
+        Info on ['folder', 'Site', 'Start', 'End', 'Length_yr', 'Completion_%'].
+
+    Notes
+    -----
+        The time step is detected for each site (the smallest time difference, if all
+        the differences are multiples of it), rather than for the whole wide frame.
+        'Completion_%' is NULL for the sites of irregular time step.
+    """
+    d_yr = 365.2422
+    rel = con.sql(f"""
+        with dt as (
+            select
+                folder, Site, TimeStamp,
+                epoch(TimeStamp - lag(TimeStamp) over (
+                    partition by folder, Site order by TimeStamp
+                )) as d
+            from {_ident(table)}
+            {_where(folder, 'Value is not null')}
+        ),
+        stp as (
+            select *, min(d) over (partition by folder, Site) as step from dt
+        ),
+        st as (
+            select
+                folder, Site,
+                min(TimeStamp) as "Start",
+                max(TimeStamp) as "End",
+                count(*) as n,
+                any_value(step) as step,
+                bool_and(d is null or d % step = 0) as regular
+            from stp
+            group by folder, Site
+        )
+        select
+            folder, Site, "Start", "End",
+            (epoch("End" - "Start") + if(regular, step, 0)) / 86400 / {d_yr} as Length_yr,
+            if(regular, n * step / (epoch("End" - "Start") + step) * 100, null)
+                as "Completion_%"
+        from st
+        order by folder, Site
+    """)
+    return _fetch(rel, to)
@@ -0,0 +1,247 @@
+"""
+The plate (LocationIdentifier -> Site name) and parameter (Parameter -> Unit) info of
+<info>, loaded once on first use into a compact, sorted index
+
+The index is cached as '{name}.idx' next to the JSON file (rebuilt whenever the JSON file
+changes, e.g. by 'scripts/python/0_update_param_site.py'), which loads faster than even
+parsing the JSON file. Only the standard library is imported (pandas is imported by
+`InfoIndex.map` alone), so that a short call stays short, e.g.:
+    > import _tools.fun_meta as fmt
+    > fmt.plates()['EM131']                      # 'Kakanui at Clifton Falls Bridge'
+    > fmt.plates().prefix('WM00')                # {plate: site} of the plates 'WM00*'
+    > fmt.plates().search('kakanui')             # {plate: site} of the names matched
+    > fmt.plates().reverse('Kakanui at Pringles')  # ['EM132']
+    > fmt.params().map(ts['Parameter'])          # The units of a column (categorical)
+"""
+import csv
+import json
+import marshal
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+_path_info = Path(__file__).resolve().parents[1] / 'info'
+
+# The layout of the '.idx' cache (bumped whenever it changes), and the Python version
+# (the `marshal` format may change between versions)
+_cache_version = (2, *sys.version_info[:2])
+
+
+def _cp(s: str) -> str:
+    """`fpd.cp(s, fg=35)`, importing `fun_s` only when an error is raised"""
+    import _tools.fun_s as fpd
+    return fpd.cp(s, fg=35)
+
+
+class InfoIndex:
+    """
+    A read-only {key: value} index of strings, sorted by the keys
+
+    Parameters
+    ----------
+    keys, values : list[str]
+        The keys (unique) and their values, in any order.
+
+    Notes
+    -----
+        * `prefix` is a binary search of the sorted keys, and `reverse` of the values
+          sorted by `order`.
+        * `search` scans the values joined as a single lower-cased text.
+        * `map` looks up the unique keys of a column only.
+    """
+
+    def __init__(self, keys: list[str], values: list[str]):
+        if len(keys) != len(values):
+            raise ValueError(_cp('`keys` and `values` must be of the same length!\n'))
+        i = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[j] for j in i]
+        self.values = [values[j] for j in i]
+        if any(a == b for a, b in zip(self.keys, self.keys[1:])):
+            raise ValueError(_cp('The keys must be unique!\n'))
+        # The positions of the values in sorted order, for `reverse`
+        self.order = sorted(range(len(self.values)), key=self.values.__getitem__)
+        self._sorted_values = None
+        self._text = None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({len(self)} keys)'
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _find(self, key: str) -> int:
+        """The position of a key, or -1"""
+        i = bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) >= 0
+
+    def __getitem__(self, key: str) -> str:
+        if (i := self._find(key)) < 0:
+            raise KeyError(key)
+        return self.values[i]
+
+    def get(self, key: str, default: 'str | None' = None) -> 'str | None':
+        return default if (i := self._find(key)) < 0 else self.values[i]
+
+    def to_dict(self) -> dict[str, str]:
+        return dict(zip(self.keys, self.values))
+
+    def prefix(self, prefix: str) -> dict[str, str]:
+        """{key: value} of the keys starting with `prefix`, such as 'WM00'"""
+        a = bisect_left(self.keys, prefix)
+        b = bisect_left(self.keys, prefix + '\U0010ffff', lo=a)
+        return dict(zip(self.keys[a:b], self.values[a:b]))
+
+    def search(self, pattern: str, regex: bool = False) -> dict[str, str]:
+        """
+        {key: value} of the values containing `pattern` (case-insensitive)
+
+        Parameters
+        ----------
+        pattern : str
+            Such as 'kakanui' or 'at sh\\d+' (with `regex`), within a single value.
+        regex : bool, optional, default=False
+            Take `pattern` as a regular expression instead of a plain text.
+
+        Returns
+        -------
+        dict[str, str]
+        """
+        if self._text is None:
+            starts, n = [], 0
+            for v in self.values:
+                starts.append(n)
+                n += len(v) + 1
+            self._text = '\n'.join(self.values).lower(), starts
+        text, starts = self._text
+        pattern = pattern.lower() if regex else re.escape(pattern.lower())
+        found = re.finditer(pattern, text)
+        rows = sorted({bisect_right(starts, i.start()) - 1 for i in found})
+        return {self.keys[i]: self.values[i] for i in rows}
+
+    def reverse(self, value: str) -> list[str]:
+        """The keys of a value, such as the plates of a site name (`[]` if none)"""
+        if self._sorted_values is None:
+            self._sorted_values = [self.values[i] for i in self.order]
+        a = bisect_left(self._sorted_values, value)
+        b = bisect_right(self._sorted_values, value, lo=a)
+        return sorted(self.keys[i] for i in self.order[a:b])
+
+    def map(self, keys: 'pd.Series | pd.Index | np.ndarray | list[str]') -> 'pd.Series':
+        """
+        Look up a column of keys as a whole - the vectorised `keys.map(dict)`
+
+        The unique keys are looked up by a binary search and broadcast back, so the cost
+        is the factorisation of the column.
+
+        Returns
+        -------
+        pd.Series
+            The values (categorical, `NaN` for the keys not found), with the index of
+            `keys` if it's a pd.Series.
+        """
+        import numpy as np
+        import pandas as pd
+        if not isinstance(keys, (pd.Series, pd.Index, np.ndarray)):
+            keys = np.asarray(keys, dtype=object)
+        codes, uniques = pd.factorize(keys)
+        v_codes, v_uniques = pd.factorize(
+            np.array([self.get(i) for i in uniques], dtype=object))
+        codes = np.where(codes >= 0, np.append(v_codes, -1)[codes], -1)
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=v_uniques),
+            index=keys.index if isinstance(keys, pd.Series) else None,
+            name=keys.name if isinstance(keys, pd.Series) else None,
+        )
+
+    # --- Cache ---
+    def save(self, path: 'str | Path', stamp: tuple[int, int] = (0, 0)) -> None:
+        """Save as a binary ('marshal') file, with the (mtime_ns, size) of its source"""
+        path = Path(path)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(marshal.dumps(
+            (_cache_version, tuple(stamp), self.keys, self.values, self.order)))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: 'str | Path', stamp: tuple[int, int] = None) -> 'InfoIndex | None':
+        """Load a file by `save` (`None` if it's not of the same source `stamp`)"""
+        try:
+            version, stamp_saved, keys, values, order = marshal.loads(
+                Path(path).read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != _cache_version or (stamp is not None and stamp_saved != tuple(stamp)):
+            return None
+        # Saved in the sorted order already
+        idx = cls.__new__(cls)
+        idx.keys, idx.values, idx.order = keys, values, order
+        idx._sorted_values = idx._text = None
+        return idx
+
+
+def _read_source(path: Path) -> tuple[list[str], list[str]]:
+    """The (keys, values) of an info JSON file {key: value}, or of a 2-column CSV file"""
+    if path.suffix == '.json':
+        d = json.loads(path.read_text(encoding='utf-8'))
+        return list(d), [('' if v is None else str(v)) for v in d.values()]
+    with path.open(encoding='utf-8', newline='') as fi:
+        rows = list(csv.reader(fi))[1:]
+    return [i[0] for i in rows], [i[1] for i in rows]
+
+
+_index: dict[Path, tuple[tuple[int, int], InfoIndex]] = {}
+
+
+def load_info(name: str, path_info: 'str | Path | None' = None) -> InfoIndex:
+    """
+    The index of '{path_info}/{name}.json' (or '.csv' if no JSON), loaded once
+
+    Parameters
+    ----------
+    name : str
+        'plate_info' or 'param_info' (or any other {key: value} JSON file in <info>).
+    path_info : str | Path | None, optional, default=None
+        The folder of the info files. If None, the <info> folder of this project.
+
+    Returns
+    -------
+    InfoIndex
+        Kept in memory and reused until the source file changes. It's cached as
+        '{path_info}/{name}.idx', which is read instead of the source next time.
+    """
+    path_info = Path(_path_info if path_info is None else path_info)
+    if not (path := path_info / f'{name}.json').exists():
+        path = path_info / f'{name}.csv'
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            _cp(f'Neither <{name}.json> nor <{name}.csv> in <{path_info}>!\n')
+        ) from None
+    stamp = (st.st_mtime_ns, st.st_size)
+    if (hit := _index.get(path)) is not None and hit[0] == stamp:
+        return hit[1]
+    path_cache = path.with_suffix('.idx')
+    if (idx := InfoIndex.load(path_cache, stamp)) is None:
+        idx = InfoIndex(*_read_source(path))
+        try:
+            idx.save(path_cache, stamp)
+        except OSError:
+            # A read-only <info> folder just means no cache
+            pass
+    _index[path] = stamp, idx
+    return idx
+
+
+def plates(path_info: 'str | Path | None' = None) -> InfoIndex:
+    """{LocationIdentifier: Site name} of 'plate_info.json', such as {'EM131': '...'}"""
+    return load_info('plate_info', path_info)
+
+
+def params(path_info: 'str | Path | None' = None) -> InfoIndex:
+    """{Parameter: Unit} of 'param_info.json', such as {'Flow': 'm^3/s'}"""
+    return load_info('param_info', path_info)
@@ -0,0 +1,248 @@
+"""
+Polars versions of the time series utilities in `_tools/fun_s.py`
+
+The time series are `pl.DataFrame`s whose first column is the time/date (pl.Datetime),
+followed by a column for each site. Missing values are either null or NaN.
+
+They are used through the `backend='polars'` argument of the respective functions in
+`_tools/fun_s.py`, or directly, e.g.:
+    > import _tools.fun_pl as fpl
+    > fpl.ts_info(fpl.from_pandas(ts))
+"""
+import pandas as pd
+import polars as pl
+
+import _tools.fun_s as fpd
+
+# The aggregations that `hourly_2_daily` accepts (the names of `pl.Expr` methods)
+_agg_pl = {'mean', 'sum', 'min', 'max', 'count', 'median', 'std', 'first', 'last'}
+
+
+def from_pandas(ts: 'pd.DataFrame | pd.Series') -> pl.DataFrame:
+    """A Timestamp-indexed pd.DataFrame/pd.Series -> pl.DataFrame (index as 1st column)"""
+    ts = pd.DataFrame(ts)
+    name = ts.index.name or 'Time'
+    return pl.from_pandas(ts.rename_axis(name).reset_index())
+
+
+def to_pandas(ts: pl.DataFrame) -> pd.DataFrame:
+    """pl.DataFrame (time/date as 1st column) -> a Timestamp-indexed pd.DataFrame"""
+    t = ts.columns[0]
+    return ts.to_pandas().set_index(t).rename_axis(columns=None)
+
+
+def _valid(ts: pl.DataFrame) -> list[pl.Expr]:
+    """Whether the values are available (neither null nor NaN), column by column"""
+    return [
+        pl.col(c).is_not_null() & ~pl.col(c).is_nan() if dt.is_float()
+        else pl.col(c).is_not_null()
+        for c, dt in list(ts.schema.items())[1:]
+    ]
+
+
+def _ts_valid_pl(ts: pl.DataFrame) -> 'str | None':
+    """Validate the time/date column, returns the error string (None if valid)"""
+    if not isinstance(ts, pl.DataFrame):
+        return '`ts` must be a pl.DataFrame!\n'
+    if ts.width < 1 or not isinstance(ts.dtypes[0], pl.Datetime):
+        return 'The 1st column of `ts` must be of pl.Datetime!\n'
+    t = ts.get_column(ts.columns[0])
+    if t.null_count() or t.n_unique() < t.len():
+        return 'The 1st column of `ts` must be unique (without null)!\n'
+    if not t.is_sorted():
+        return 'The 1st column of `ts` must be in ascending order!\n'
+    return None
+
+
+def ts_step(ts: pl.DataFrame, minimum_time_step_in_second: int = 60) -> 'int | None':
+    """
+    Identify the temporal resolution (in seconds) for a time series - see `fpd.ts_step`
+
+    Parameters
+    ----------
+    ts : pl.DataFrame
+        A Polars DataFrame, whose first column is the time/date.
+    minimum_time_step_in_second : int, default=60
+        The minimum threshold of the time step that can be identified.
+
+    Raises
+    ------
+    TypeError
+        When `_ts_valid_pl(ts) is not None` is False.
+
+    Returns
+    -------
+    int | None
+        * **`-1`**: time series is not in a regular time step.
+        * Any integer **above `0`**: time series is regular (step in secs).
+        * **`None`**: contains no values or a single value.
+    """
+    if err_str := _ts_valid_pl(ts):
+        raise TypeError(fpd.cp(err_str, fg=35))
+    t = ts.columns[0]
+    x = ts.lazy().filter(pl.any_horizontal(_valid(ts))) if ts.width > 1 else ts.lazy()
+    # In integer nanoseconds, as the float modulo of Polars is not exact
+    d = (
+        x.select(pl.col(t).diff().dt.total_nanoseconds().alias('d').drop_nulls())
+        .collect()
+        .get_column('d')
+    )
+    if d.len() == 0:
+        return None
+    step_minimum = d.filter(d >= minimum_time_step_in_second * 10**9).min()
+    if step_minimum is None:
+        # None of the intervals reaches the threshold, as `fpd.ts_step`
+        return -1
+    return step_minimum // 10**9 if (d % step_minimum == 0).all() else -1
+
+
+def na_ts_insert(ts: pl.DataFrame) -> pl.DataFrame:
+    """
+    Pad null into a time series (between the first and the last available values)
+
+    Parameters
+    ----------
+    ts : pl.DataFrame
+        A Polars DataFrame, whose first column is the time/date.
+
+    Returns
+    -------
+    pl.DataFrame
+        The null-padded time series. As for irregular time series, the rows without any
+        available values removed.
+    """
+    r = ts.filter(pl.any_horizontal(_valid(ts))) if ts.width > 1 else ts
+    if (step := ts_step(ts)) in {-1, None}: return r
+    return r.upsample(time_column=ts.columns[0], every=f'{step}s')
+
+
+def hourly_2_daily(
+        hts: pl.DataFrame,
+        day_starts_at: int = 0,
+        agg: str = 'mean',
+        prop: float = 1.
+    ) -> pl.DataFrame:
+    """
+    Aggregate the hourly time series to daily time series - see `fpd.hourly_2_daily`
+
+    Parameters
+    ----------
+    hts : pl.DataFrame
+        An hourly time series (its first column is the time), of a site or multiple sites.
+    day_starts_at : int, optional, default=0
+        What time (hour) a day starts - 0 o'clock by default.
+    agg : str, optional, default='mean'
+        One of ['mean', 'sum', 'min', 'max', 'count', 'median', 'std', 'first', 'last'].
+    prop : float, optional, default=1
+        The ratio of the available data (within a day range)
+
+    Returns
+    -------
+    pl.DataFrame
+        * A single site: columns ['Date', f'Agg_{agg}', 'Site']
+        * Multiple sites: columns ['Date', *sites]
+    """
+    if not isinstance(day_starts_at, int) or day_starts_at < 0 or day_starts_at > 23:
+        raise ValueError('`day_starts_at` must be an integer in [0, 23]!\n')
+    if prop < 0 or prop > 1:
+        raise ValueError('`prop` must be in [0, 1]!\n')
+    if agg not in _agg_pl:
+        raise ValueError(fpd.cp(f'`agg` must be one of {sorted(_agg_pl)}!\n', fg=35))
+    if err_str := _ts_valid_pl(hts):
+        raise TypeError(fpd.cp(err_str, fg=35))
+    t, *sites = hts.columns
+    # The aggregations skip nulls, except 'first' & 'last'
+    col = (lambda c: pl.col(c).drop_nulls()) if agg in {'first', 'last'} else pl.col
+    # Hourly values are labelled by the end of the hours
+    d = (
+        hts.lazy()
+        .with_columns(pl.col(sites).fill_nan(None) if sites else [])
+        .group_by(
+            (pl.col(t) - pl.duration(hours=1 + day_starts_at))
+            .dt.truncate('1d')
+            .alias('Date')
+        )
+        .agg(
+            [pl.col(c).count().alias(f'n_{i}') for i, c in enumerate(sites)]
+            + [getattr(col(c), agg)().alias(c) for c in sites]
+        )
+        .select(
+            pl.col('Date').cast(hts.schema[t]),
+            *[
+                pl.when((pl.col(f'n_{i}') > 0) & (pl.col(f'n_{i}') / 24 >= prop))
+                .then(pl.col(c).cast(pl.Float64))
+                .alias(c)
+                for i, c in enumerate(sites)
+            ],
+        )
+        .sort('Date')
+        .collect()
+        .pipe(na_ts_insert)
+    )
+    if len(sites) > 1:
+        return d
+    return d.rename({sites[0]: f'Agg_{agg}'}).with_columns(Site=pl.lit(sites[0]))
+
+
+def ts_info(ts: pl.DataFrame) -> 'pl.DataFrame | None':
+    """
+    Obtain the time series data availability - see `fpd.ts_info`
+
+    Parameters
+    ----------
+    ts : pl.DataFrame
+        A Polars DataFrame, whose first column is the time/date.
+
+    Returns
+    -------
+    pl.DataFrame
+        Info on ['Site', 'Start', 'End', 'Length_yr', 'Completion_%'].
+        As for time series of irregular time step, 'Completion_%' column is ignored.
+    """
+    if (con := ts_step(ts)) is None: return None
+    t, *sites = ts.columns
+    tt = pl.col(t)
+    st = ts.lazy().select(
+        [
+            pl.struct(
+                Site=pl.lit(c, dtype=pl.String),
+                Start=tt.filter(v).first(),
+                End=tt.filter(v).last(),
+                n=v.sum(),
+            ).alias(c)
+            for c, v in zip(sites, _valid(ts))
+        ]
+    )
+    info = (
+        st.unpivot().unnest('value').drop('variable').collect()
+        .with_columns(n=pl.when(pl.col('n') > 0).then(pl.col('n')))
+    )
+    d_yr = 365.2422
+    length_yr = (pl.col('End') - pl.col('Start')).dt.total_nanoseconds() / 86400e9 / d_yr
+    if con == -1:
+        return info.select('Site', 'Start', 'End', length_yr.alias('Length_yr'))
+    step_day = con / (3600 * 24)
+    return info.select(
+        'Site', 'Start', 'End',
+        (length_yr + step_day / d_yr).alias('Length_yr'),
+        (pl.col('n') * step_day / (length_yr * d_yr + step_day) * 100)
+        .alias('Completion_%'),
+    )
+
+
+def ts_merge(ts_list: list[pl.DataFrame]) -> pl.DataFrame:
+    """
+    Outer join a list of time series (with the same name of time/date columns) side by side
+
+    Parameters
+    ----------
+    ts_list : list[pl.DataFrame]
+        Time series (their first columns are the time), with no site names in common.
+
+    Returns
+    -------
+    pl.DataFrame
+        Sorted by the time/date.
+    """
+    t = ts_list[0].columns[0]
+    return pl.concat(ts_list, how='align').sort(t)
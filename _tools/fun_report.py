@@ -0,0 +1,194 @@
+"""
+A Python replacement of `Get-TimeSeries` ('_tools/Get-TimeSeries.psm1') + ReportRunner.exe
+
+The report templates in <report_setting> ('Time Series Data', one input of a ProcessChain
+of at most one 'Statistic') are evaluated against AQ's Publish v2 API, for many UniqueIds
+concurrently, and saved as the CSV files of the same layout as ReportRunner's, i.e.
+'{out_folder}/{UniqueId}.csv' readable by `fpd.read_csv_AQ` and the post-processing scripts.
+
+E.g.:
+    > import _tools.fun_report as frp
+    > frp.run_reports(uid_list, 'report_setting/daily_mean.json', 'out/csv/dFlo', 8)
+"""
+import datetime
+import json
+import uuid
+from pathlib import Path
+from urllib import parse
+
+import pandas as pd
+
+import _tools.fun_s as fpd
+
+
+def read_report_setting(json_path: 'str | Path') -> dict:
+    """
+    Read a report template (such as 'report_setting/daily_mean.json')
+
+    Parameters
+    ----------
+    json_path : str | Path
+
+    Returns
+    -------
+    dict
+        {'name', 'title', 'comment', 'time_range', 'process_chain'}, where 'process_chain'
+        is the list of processes applied to the time series (input) of the template.
+    """
+    json_path = Path(json_path)
+    d = json.loads(json_path.read_text())
+    param = d.get('Parameters', {})
+    return {
+        'name': json_path.name,
+        'title': param.get('ReportTitle', {}).get('Value', json_path.stem),
+        'comment': param.get('Comment', {}).get('Value', ''),
+        'time_range': d.get('RequestedTimeRange', {'Type': 'EntireRecord'}),
+        'process_chain': fpd.agg_spec(json_path),
+    }
+
+
+def get_ts_descriptions(
+        uid_list: list[str],
+        client: fpd.AquariusClient = None,
+        batch: int = 100,
+    ) -> dict[str, dict]:
+    """
+    Get the time series descriptions ('GetTimeSeriesDescriptionListByUniqueId') in bulk
+
+    Parameters
+    ----------
+    uid_list : list[str]
+        The UniqueIds of the time series.
+    client : AquariusClient, optional, default=None
+        The session used for the requests. `fpd.default_client()` is used when `None`.
+    batch : int, optional, default=100
+        The number of UniqueIds in a request.
+
+    Returns
+    -------
+    dict[str, dict]
+        {UniqueId: description}, such as {'30e1...': {'Parameter': 'Discharge', ...}}
+    """
+    if client is None:
+        client = fpd.default_client()
+    url = client.url('GetTimeSeriesDescriptionListByUniqueId')
+    r_dict = {}
+    for i in range(0, len(uid_list), batch):
+        q_str = parse.urlencode({'TimeSeriesUniqueIds': ','.join(uid_list[i:i + batch])})
+        r = fpd.get_AQ(f'{url}?{q_str}', client=client)
+        ld = json.loads(r.data.decode('utf-8')).get('TimeSeriesDescriptions') or []
+        r_dict |= {j.get('UniqueId'): j for j in ld}
+    return r_dict
+
+
+def _query_range(time_range: dict) -> tuple['str | None', 'str | None']:
+    """
+    The (QueryFrom, QueryTo) strings for 'RequestedTimeRange' of a template (`None` for
+    the whole record)
+    """
+    if time_range.get('Type', 'EntireRecord') == 'EntireRecord':
+        return None, None
+    if 'StartTime' in time_range and 'EndTime' in time_range:
+        return time_range['StartTime'], time_range['EndTime']
+    raise ValueError(fpd.cp(f'RequestedTimeRange {time_range} is not supported!\n', fg=35))
+
+
+def run_report(
+        uid: str,
+        setting: dict,
+        out_folder: 'str | Path',
+        desc: dict,
+        client: fpd.AquariusClient = None,
+        **kwargs
+    ) -> Path:
+    """
+    Evaluate a report template for a time series, and save it as a CSV file of
+    ReportRunner's layout - see `run_reports`
+
+    Returns
+    -------
+    Path
+        '{out_folder}/{uid}.csv'
+    """
+    if desc is None:
+        raise ValueError(fpd.cp(f'No time series found for UniqueId {uid}!\n', fg=35))
+    param, lab, plate = desc['Parameter'], desc['Label'], desc['LocationIdentifier']
+    ts = fpd.get_points_AQ(uid, *_query_range(setting['time_range']), client, **kwargs)
+    ts = pd.Series(dtype=float) if ts is None else pd.Series(
+        ts['Value'].to_numpy(), index=fpd.parse_24h_datetime(ts['Timestamp'])
+    )
+    ts = fpd.apply_process_chain(ts, setting['process_chain'])
+    stat = ' '.join(
+        f"{i.get('Period')} {i.get('StatType')}" for i in setting['process_chain']
+    ) or 'Raw'
+    head = [
+        f"# {setting['title']}",
+        f"# Description: {setting['name']}",
+        f"# Comment: {setting['comment']}",
+        '# Generated by: _tools/fun_report.py (AQUARIUS Publish v2)',
+        f'# Generated at: {datetime.datetime.now():%Y-%m-%d %H:%M:%S}',
+        f"# Time range: {setting['time_range'].get('Type')}",
+        '# Time series:',
+        f'# {uuid.UUID(uid)} {param}.{lab}@{plate}: {stat} ({desc.get("Unit", "")})',
+        f"# UTC offset: {desc.get('UtcOffset', '')}",
+        f'# Points: {ts.size}',
+        '#',
+    ]
+    out_folder = Path(out_folder)
+    out_folder.mkdir(parents=True, exist_ok=True)
+    # The same file name as `Get-TimeSeries`
+    fo_path = out_folder / f"{uid.replace('/', '$')}.csv"
+    with fo_path.open('w', encoding='utf-8', newline='') as fo:
+        fo.write('\n'.join(i.replace(',', ';') for i in head) + '\n')
+        ts.rename(f'{param}@{plate}').rename_axis('TimeStamp').to_frame().to_csv(
+            fo, date_format='%Y-%m-%d %H:%M:%S', lineterminator='\n',
+        )
+    return fo_path
+
+
+def run_reports(
+        uid_list: 'str | list[str]',
+        json_path: 'str | Path',
+        out_folder: 'str | Path' = 'out/csv',
+        max_workers: int = 4,
+        client: fpd.AquariusClient = None,
+        **kwargs
+    ) -> dict[str, Path]:
+    """
+    Evaluate a report template for the time series (UniqueIds) concurrently - the same
+    as looping `Get-TimeSeries` over the UniqueIds (see 'scripts/*.ps1')
+
+    Parameters
+    ----------
+    uid_list : str | list[str]
+        The UniqueIds of the time series.
+    json_path : str | Path
+        The report template, such as 'report_setting/daily_mean.json'.
+    out_folder : str | Path, optional, default='out/csv'
+        The folder of the CSV files, such as 'out/csv/dFlo'.
+    max_workers : int, optional, default=4
+        The number of time series requested concurrently (threads).
+        See `fpd.set_rate_limit` for capping the requests per second sent to Aquarius.
+    client : AquariusClient, optional, default=None
+        The session shared by all the requests. `fpd.default_client()` is used when `None`.
+    **kwargs
+        Passed to the download of the points, such as `chunk` (see `fpd.get_ts_AQ`).
+
+    Returns
+    -------
+    dict[str, Path]
+        {UniqueId: CSV file}. The failed ones are printed and left out.
+    """
+    if isinstance(uid_list, str):
+        uid_list = [uid_list]
+    uid_list = list(dict.fromkeys(uid_list))
+    if client is None:
+        client = fpd.default_client()
+    setting = read_report_setting(json_path)
+    desc = get_ts_descriptions(uid_list, client)
+    d, _ = fpd.fetch_concurrently(
+        lambda uid, **kw: run_report(uid, desc=desc.get(uid), **kw),
+        uid_list, max_workers,
+        setting=setting, out_folder=out_folder, client=client, **kwargs,
+    )
+    return d
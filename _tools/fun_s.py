@@ -1,17 +1,56 @@
 
+from __future__ import annotations
+
+import codecs
+import contextvars
+import csv
 import datetime
+import importlib
 import json
+import re
+import shutil
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from functools import reduce
-from typing import Any, Callable
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
 from urllib import parse
 
-import numpy as np
-import pandas as pd
-import urllib3
 
-# Some display settings for numpy Array, Pandas DataFrame
-np.set_printoptions(precision=4, linewidth=94, suppress=True)
-pd.set_option('display.max_columns', None)
+class _LazyModule:
+    """
+    A module imported on the first access of its attributes, which then takes the place
+    of the proxy in this module (so that a short call, such as building a URL, doesn't
+    pay for importing numpy, pandas & urllib3)
+    """
+
+    def __init__(self, name: str, alias: str):
+        self._name, self._alias = name, alias
+
+    def __getattr__(self, attr: str) -> Any:
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import urllib3
+else:
+    np = _LazyModule('numpy', 'np')
+    pd = _LazyModule('pandas', 'pd')
+    urllib3 = _LazyModule('urllib3', 'urllib3')
+
+
+def set_display() -> None:
+    """Some display settings for numpy Array, Pandas DataFrame (no longer set on import)"""
+    np.set_printoptions(precision=4, linewidth=94, suppress=True)
+    pd.set_option('display.max_columns', None)
 
 
 def cp(s: Any = '', /, display: int = 0, fg: int = 39, bg: int = 48) -> str:
@@ -101,33 +140,109 @@ def is_numeric(x: Any, /) -> bool:
     return isinstance(x, (int, float, complex)) and not isinstance(x, bool)
 
 
+_valid_index: dict[int, weakref.ref] = {}
+
+
+def _mark_index_valid(idx: pd.Index, /) -> None:
+    """Remember an index passing the checks in `_ts_valid_pd` (while it's alive)"""
+    key = id(idx)
+    _valid_index[key] = weakref.ref(idx, lambda _, key=key: _valid_index.pop(key, None))
+
+
+def _valid_rows(ts: 'pd.DataFrame | pd.Series', /) -> 'np.ndarray | None':
+    """
+    Whether each row has any available value (`None` for all of them), from the NaN mask
+    of 256 columns at a time
+    """
+    if isinstance(ts, pd.Series):
+        m = ts.notna().to_numpy()
+    else:
+        m = np.zeros(ts.shape[0], dtype=bool)
+        for j in range(0, ts.shape[1], 256):
+            m |= ts.iloc[:, j:j + 256].notna().to_numpy().any(axis=1)
+    return None if m.all() else m
+
+
 def _ts_valid_pd(ts: Any, /) -> str:
     """Validate the input time series: `None` returned as passed"""
     if not isinstance(ts, (pd.Series, pd.DataFrame)):
         return '`ts` must be either pandas.Series or pandas.DataFrame!'
-    if not (
-        all(isinstance(i, (datetime.datetime, datetime.date)) for i in ts.index)
-        or pd.api.types.is_datetime64_any_dtype(ts.index)
-    ):
-        return f'Wrong dtype in the index: `{ts.index.dtype}` detected!'
-    if not (ts.index.size == ts.index.unique().size):
-        return '`ts.index` must be unique!'
-    if not all(ts.index == ts.index.sort_values(ascending=True)):
-        return '`ts.index` must be in chronicle order!'
+    idx = ts.index
+    if (ref := _valid_index.get(id(idx))) is None or ref() is not idx:
+        if not (
+            pd.api.types.is_datetime64_any_dtype(idx)
+            or all(isinstance(i, (datetime.datetime, datetime.date)) for i in idx)
+        ):
+            return f'Wrong dtype in the index: `{idx.dtype}` detected!'
+        if not idx.is_unique:
+            return '`ts.index` must be unique!'
+        if not idx.is_monotonic_increasing:
+            return '`ts.index` must be in chronicle order!'
+        _mark_index_valid(idx)
     if isinstance(ts, pd.DataFrame):
         if ts.shape[1] < 1:
             return 'No column exists in the DataFrame `ts`!'
-        df = ts.select_dtypes(include=np.number)
-        if not (df.shape[1] == ts.shape[1]):
+        # The same dtypes as `ts.select_dtypes(include=np.number)`, checked once each
+        if not all(
+            pd.api.types.is_numeric_dtype(i) and not pd.api.types.is_bool_dtype(i)
+            or pd.api.types.is_timedelta64_dtype(i)
+            for i in set(ts.dtypes)
+        ):
             return 'All columns in `ts` must be numeric!'
         return None
     if not pd.api.types.is_any_real_numeric_dtype(ts):
         return 'The Series must contain real numbers!'
 
 
+def ts_validate(ts: 'pd.DataFrame | pd.Series') -> 'pd.DataFrame | pd.Series':
+    """
+    Validate a time series once, so the functions called on it later skip the checks
+
+    Parameters
+    ----------
+    ts : pd.DataFrame | pd.Series
+        A Pandas DataFrame or pd.Series indexed by time/date.
+
+    Raises
+    ------
+    TypeError
+        When `_ts_valid_pd(ts) is not None` is False.
+
+    Returns
+    -------
+    pd.DataFrame | pd.Series
+        The same `ts` (for chaining by `.pipe(ts_validate)`).
+
+    Notes
+    -----
+        The checks on the index (dtype, uniqueness and order) are remembered for the
+        index object, and shared by all the frames/Series holding the same index.
+        Only the (cheap) checks on the columns are repeated.
+    """
+    if err_str := _ts_valid_pd(ts):
+        raise TypeError(cp(err_str, fg=35))
+    return ts
+
+
+def _polars(ts: Any, backend: str = 'polars') -> tuple:
+    """
+    The Polars backend (`_tools/fun_pl.py`) and `ts` as a pl.DataFrame, or (None, ts) for
+    the Pandas backend
+    """
+    if backend == 'pandas':
+        return None, ts
+    if backend != 'polars':
+        raise ValueError(
+            cp(f"`backend` must be 'pandas' or 'polars' (got {backend!r})!\n", fg=35)
+        )
+    import _tools.fun_pl as fpl
+    return fpl, ts if isinstance(ts, fpl.pl.DataFrame) else fpl.from_pandas(ts)
+
+
 def ts_step(
         ts: 'pd.DataFrame | pd.Series',
-        minimum_time_step_in_second: int = 60
+        minimum_time_step_in_second: int = 60,
+        backend: str = 'pandas',
     ) -> 'int | None':
     """
     Identify the temporal resolution (in seconds) for a time series
@@ -138,6 +253,8 @@ def ts_step(
         A Pandas DataFrame indexed by time/date.
     minimum_time_step_in_second : int, default=60
         The minimum threshold of the time step that can be identified.
+    backend : str, default='pandas'
+        'pandas', or 'polars' (`_tools/fun_pl.py`, also taking a pl.DataFrame).
 
     Raises
     ------
@@ -150,18 +267,45 @@ def ts_step(
         * **`-1`**: time series is not in a regular time step.
         * Any integer **above `0`**: time series is regular (step in secs).
         * **`None`**: contains no values or a single value.
+
+    Notes
+    -----
+        The intervals between the rows with any values are taken in integer nanoseconds
+        from the index, and the series is regular if their GCD is the smallest interval
+        (of at least `minimum_time_step_in_second`).
+
+        The step is not memoised, as the values (hence the rows with any values) may be
+        changed in place under the same index. Nearly all the time is the NaN mask of the
+        values, which a safe memo would have to check anyway.
     """
+    fpl, ts = _polars(ts, backend)
+    if fpl is not None:
+        return fpl.ts_step(ts, minimum_time_step_in_second)
     if err_str := _ts_valid_pd(ts):
         raise TypeError(cp(err_str, fg=35))
-    x = ts.dropna(axis=0, how='all')
-    if x.shape[0] in (0, 1):
+    return _step_of_rows(ts.index, _valid_rows(ts), minimum_time_step_in_second)
+
+
+def _step_of_rows(idx: pd.Index, m: 'np.ndarray | None', minimum: int) -> 'int | None':
+    """`ts_step` of the rows `m` (all of them for `None`) of a validated index"""
+    if not isinstance(idx, pd.DatetimeIndex):
+        idx = pd.DatetimeIndex(idx)
+    t = idx.asi8 if m is None else idx.asi8[m]
+    if t.size < 2:
         return None
-    diff_in_second = (pd.Series(x.index).diff() / np.timedelta64(1, 's')).values[1:]
-    step_minimum = diff_in_second[diff_in_second >= minimum_time_step_in_second].min()
-    return int(step_minimum) if (diff_in_second % step_minimum == 0).all() else -1
+    # In the unit of the index (ns, us, ms or s)
+    unit = np.timedelta64(1, 's') // np.timedelta64(1, idx.unit)
+    d = np.diff(t)
+    d_min = d[d >= minimum * unit]
+    if d_min.size and np.gcd.reduce(d) == (step_minimum := d_min.min()):
+        return int(step_minimum // unit)
+    return -1
 
 
-def na_ts_insert(ts: 'pd.DataFrame | pd.Series') -> pd.DataFrame:
+def na_ts_insert(
+        ts: 'pd.DataFrame | pd.Series',
+        backend: str = 'pandas',
+    ) -> 'pd.DataFrame | pl.DataFrame':
     """
     Pad NaN value into a Timestamp-indexed DataFrame or Series
 
@@ -169,50 +313,133 @@ def na_ts_insert(ts: 'pd.DataFrame | pd.Series') -> pd.DataFrame:
     ----------
     ts : pd.DataFrame | pd.Series
         A Pandas DataFrame or pd.Series indexed by time/date.
+    backend : str, default='pandas'
+        'pandas', or 'polars' (`_tools/fun_pl.py`, also taking a pl.DataFrame).
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame | pl.DataFrame
         The NaN-padded Timestamp-indexed Series/DataFrame.
+        A pl.DataFrame (time/date as the 1st column) padded with null for 'polars'.
 
     Notes
     -----
         * As for irregular time series, The empty-row-removed DataFrame returned.
         * The attributes in `ts.attrs` is maintained after using it.
     """
-    r = pd.DataFrame(ts).dropna(axis=0, how='all')
-    if (step := ts_step(ts)) in {-1, None}: return r
+    fpl, ts = _polars(ts, backend)
+    if fpl is not None:
+        return fpl.na_ts_insert(ts)
+    if err_str := _ts_valid_pd(ts):
+        raise TypeError(cp(err_str, fg=35))
+    # The rows with any values, found once for both the step and the rows kept
+    m = _valid_rows(ts)
+    r = pd.DataFrame(ts) if m is None else pd.DataFrame(ts)[m]
+    if (step := _step_of_rows(ts.index, m, 60)) in {-1, None}:
+        # Never a view of `ts`
+        return r.copy() if m is None else r
     r = r.asfreq(freq=f'{step}s')
     r.index.freq = None
     r.attrs = ts.attrs
+    _mark_index_valid(r.index)
     return r
 
 
+def ts_merge(ts_list: 'list[pd.DataFrame | pd.Series]') -> pd.DataFrame:
+    """
+    Outer join a list of Timestamp-indexed time series side by side in a single pass
+
+    Parameters
+    ----------
+    ts_list : list[pd.DataFrame | pd.Series]
+        Time series indexed by time/date, with no column names in common.
+        The single pass applies to float64 columns indexed by unique DatetimeIndex of the
+        same dtype (the `reduce` above is used otherwise).
+
+    Returns
+    -------
+    pd.DataFrame
+        The same as `reduce(lambda a, b: a.join(b, how='outer'), ts_list)`.
+
+    Notes
+    -----
+        The union of the indexes is computed once, and the values of each time series
+        are written into their rows of a preallocated 2-D float array, instead of
+        re-aligning and copying the growing frame once per time series.
+    """
+    lst = [pd.DataFrame(i) for i in ts_list]
+    col = [c for i in lst for c in i.columns]
+    if not lst or pd.Index(col).has_duplicates or not all(
+        isinstance(i.index, pd.DatetimeIndex)
+        and i.index.dtype == lst[0].index.dtype
+        and i.index.is_unique
+        and (i.dtypes == np.float64).all()
+        for i in lst
+    ):
+        return reduce(lambda a, b: a.join(b, how='outer'), lst)
+    idx = np.unique(np.concatenate([i.index.to_numpy() for i in lst]))
+    v = np.full((idx.size, len(col)), np.nan)
+    j = 0
+    for i in lst:
+        v[np.searchsorted(idx, i.index.to_numpy()), j:j + i.shape[1]] = i.to_numpy(float)
+        j += i.shape[1]
+    return pd.DataFrame(
+        v,
+        index=pd.DatetimeIndex(idx, name=lst[0].index.name),
+        columns=pd.Index(col),
+    )
+
+
+_agg_builtin: dict[Callable, str] = {}
+
+
+def _agg_name(agg: 'Callable | str') -> 'str | None':
+    """The name of a built-in aggregation, such as 'mean' for `pd.Series.mean`, or None"""
+    if not _agg_builtin:
+        _agg_builtin.update({
+            pd.Series.mean: 'mean', pd.Series.sum: 'sum', pd.Series.min: 'min',
+            pd.Series.max: 'max', pd.Series.count: 'count',
+            np.mean: 'mean', np.sum: 'sum', np.min: 'min', np.max: 'max',
+            sum: 'sum', min: 'min', max: 'max',
+        })
+    return _agg_builtin.get(agg)
+
+
 def hourly_2_daily(
         hts: 'pd.DataFrame | pd.Series',
         day_starts_at: int = 0,
-        agg: Callable = pd.Series.mean,
-        prop: float = 1.
-    ) -> pd.DataFrame:
+        agg: 'Callable | str' = 'mean',
+        prop: float = 1.,
+        backend: str = 'pandas',
+    ) -> 'pd.DataFrame | pl.DataFrame':
     """
     Aggregate the hourly time series to daily time series using customised function
 
     Parameters
     ----------
     hts : pd.DataFrame | pd.Series
-        An hourly time series (for a single site)
+        An hourly time series (for a single site), or a wide frame of multiple sites
     day_starts_at : int, optional, default=0
         What time (hour) a day starts - 0 o'clock by default.
         e.g., 9 means the output of daily time series by 9 o'clock!
-    agg : Callable, optional, default=pd.Series.mean
-        Customised aggregation function - mean by default (`pd.Series.mean`)
+    agg : Callable | str, optional, default='mean'
+        Customised aggregation function - mean by default (`pd.Series.mean`).
+        'mean', 'sum', 'min', 'max' and 'count' (or the respective `pd.Series` methods)
+        run for all the sites at once. Other callables run day by day and site by site.
     prop : float, optional, default=1
         The ratio of the available data (within a day range)
+    backend : str, optional, default='pandas'
+        'pandas', or 'polars' (`_tools/fun_pl.py`, also taking a pl.DataFrame), for which
+        `agg` is one of ['mean', 'sum', 'min', 'max', 'count', 'median', 'std', 'first',
+        'last'] (or the respective built-in functions above).
 
     Returns
     -------
-    pd.DataFrame
-        A daily time series (pd.DataFrame) with an extra column of site name
+    pd.DataFrame | pl.DataFrame
+        * A single site: a daily time series (pd.DataFrame) with an extra column of
+          site name
+        * Multiple sites: a daily time series of the same columns as `hts`
+        * A pl.DataFrame (with 'Date' as the 1st column) for 'polars'
 
     Raises
     ------
@@ -225,22 +452,28 @@ def hourly_2_daily(
         raise ValueError('`day_starts_at` must be an integer in [0, 23]!\n')
     if prop < 0 or prop > 1:
         raise ValueError('`prop` must be in [0, 1]!\n')
-    hts_c = na_ts_insert(hts).dropna()
+    fpl, hts = _polars(hts, backend)
+    if fpl is not None:
+        return fpl.hourly_2_daily(hts, day_starts_at, _agg_name(agg) or agg, prop)
+    hts_c = pd.DataFrame(hts).pipe(ts_validate)
+    name = agg if isinstance(agg, str) else agg.__name__
+    fun = agg if isinstance(agg, str) else _agg_name(agg)
+    # Hourly values are labelled by the end of the hours
+    date_new = pd.DatetimeIndex(hts_c.index) - pd.Timedelta(hours=1 + day_starts_at)
+    g = hts_c.groupby(date_new.floor('D').rename('Date'), sort=True)
+    n = g.count()
+    d = getattr(g, fun)() if fun is not None else g.agg(lambda v: agg(v.dropna()))
+    d = d.where((n > 0) & (n / 24 >= prop)).pipe(na_ts_insert)
+    if hts_c.shape[1] > 1:
+        return d
     site = hts_c.columns[0]
-    date_new = (hts_c.index - pd.Timedelta(f'{3600 * (1+day_starts_at)}s')).date
-    u = pd.DataFrame({'Date': date_new, 'Value': hts_c.squeeze().values}).set_index('Date')
-    u['Prop'] = u.groupby('Date', sort=False)['Value'].transform('size') / 24
-    return (
-        u.query('Prop >= @prop')
-        .groupby('Date', sort=False)
-        .agg(Agg=('Value', agg))
-        .rename(columns={'Agg': f'Agg_{agg.__name__}'})
-        .pipe(na_ts_insert)
-        .assign(Site=site)
-    )
+    return d.rename(columns={site: f'Agg_{name}'}).assign(Site=site)
 
 
-def ts_info(ts: 'pd.DataFrame | pd.Series') -> pd.DataFrame:
+def ts_info(
+        ts: 'pd.DataFrame | pd.Series',
+        backend: str = 'pandas',
+    ) -> 'pd.DataFrame | pl.DataFrame':
     """
     Obtain the Timestamp-indexed time series (ts) data availability
 
@@ -248,29 +481,42 @@ def ts_info(ts: 'pd.DataFrame | pd.Series') -> pd.DataFrame:
     ----------
     ts : pd.DataFrame
         A Pandas DataFrame indexed by time/date.
+    backend : str, default='pandas'
+        'pandas', or 'polars' (`_tools/fun_pl.py`, also taking a pl.DataFrame).
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame | pl.DataFrame
         Info on ['Site', 'Start', 'End', 'Length_yr', 'Completion_%'].
         As for time series of irregular time step, 'Completion_%' column is ignored.
+
+    Notes
+    -----
+        The statistics are reduced from the NaN mask of 256 columns at a time, so the
+        memory needed grows with the number of columns rather than the number of cells.
     """
+    fpl, ts = _polars(ts, backend)
+    if fpl is not None:
+        return fpl.ts_info(ts)
     if (con := ts_step(ts)) is None: return None
     if isinstance(ts, pd.Series): ts = ts.to_frame()
-    col_name = pd.Index(ts.columns.tolist(), dtype=str, name='Site')
-    col_name_ = [f'{i}_' for i in col_name]
-    empty_df = pd.DataFrame(index=pd.Index(col_name_, dtype=str, name='Site'))
-    ts_w = ts.reset_index()
-    ts_w.columns = ['Time'] + col_name_
-    ts_l = ts_w.melt(id_vars='Time', var_name='Site', value_name='V').dropna()
-    info = ts_l.groupby('Site', sort=False).agg(
-        Start=('Time', 'min'),
-        End=('Time', 'max'),
-        n=('V', pd.Series.count),
-    )
+    # First/last valid rows and counts per column, from the NaN mask of a column block
+    n_row, n_col, size = *ts.shape, 256
+    first, last, n = (np.zeros(n_col, dtype=np.int64) for _ in range(3))
+    for j in range(0, n_col, size):
+        m = ~np.isnan(ts.iloc[:, j:j + size].to_numpy(dtype=float))
+        first[j:j + size] = m.argmax(axis=0)
+        last[j:j + size] = n_row - 1 - m[::-1].argmax(axis=0)
+        n[j:j + size] = m.sum(axis=0)
+    has = n > 0
+    info = pd.DataFrame({
+        'Site': pd.Index(ts.columns.tolist(), dtype=str),
+        'Start': pd.Series(ts.index.take(first)).where(has),
+        'End': pd.Series(ts.index.take(last)).where(has),
+        'n': pd.Series(n).where(has),
+    })
     d_yr = 365.2422
     info['Length_yr'] = (info['End'] - info['Start']) / pd.Timedelta(f'{d_yr}D')
-    info = empty_df.join(info, how='left').set_index(col_name).reset_index()
     if con == -1: return info.drop('n', axis=1)
     step_day = con / (3600 * 24)
     info = info.assign(
@@ -281,18 +527,520 @@ def ts_info(ts: 'pd.DataFrame | pd.Series') -> pd.DataFrame:
     return info.drop(columns=['n', 'N'])
 
 
+# --- Instrumentation ---
+_stage_cols = ('seconds', 'calls', 'bytes', 'points', 'retries', 'errors')
+
+
+class PipelineStats:
+    """
+    The per-stage timers and counters of the downloads run inside `instrument()`
+
+    Each record is `{'stage', 'site', 'seconds', 'bytes', 'points', 'retries', 'errors'}`,
+    where 'site' is `None` for the work shared by all the sites (such as the bulk
+    UniqueId lookup and the join). The stages are:
+        * 'uid'        - UniqueId lookup (`resolve_uids` in bulk, or `get_uid`)
+        * 'http'       - a request until its response (the body is read by 'decode'
+                         when streamed), with the bytes of a preloaded body and the
+                         retries done by urllib3
+        * 'decode'     - reading and decoding the streamed points, with the bytes and
+                         points transferred
+        * 'timestamps' - `parse_24h_datetime`
+        * 'pad'        - `na_ts_insert` of a site
+        * 'join'       - `ts_merge` + `na_ts_insert` of all the sites
+        * 'site'       - the whole work of a site (`_fetch_sites` / `_iter_sites`)
+    The seconds of a stage are summed over the threads, so they can exceed `wall`.
+    """
+
+    def __init__(self, callback: 'Callable[[dict], Any] | None' = None):
+        self.callback = callback
+        self.records: list[dict] = []
+        self.wall = 0.
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({len(self.records)} records, {self.wall:.3f} s)'
+
+    def add(self, stage: str, site: 'str | None' = None, seconds: float = 0., **counts):
+        """Add a record (`counts` of 'bytes', 'points', 'retries' and 'errors')"""
+        rec = {'stage': stage, 'site': site, 'seconds': seconds,
+               'bytes': 0, 'points': 0, 'retries': 0, 'errors': 0} | counts
+        with self._lock:
+            self.records.append(rec)
+        if self.callback is not None:
+            self.callback(rec)
+
+    def summary(self, by: 'str | list[str]' = 'stage') -> pd.DataFrame:
+        """
+        The records summed by 'stage', 'site' or ['site', 'stage']
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns ['seconds', 'calls', 'bytes', 'points', 'retries', 'errors'], with
+            the shared work (no site) labelled '*' when summed by 'site'. Summed by
+            'site' only, the seconds of a site are those of its 'site' stage (which
+            includes the others), and 'calls' counts the other stages.
+        """
+        df = pd.DataFrame(
+            self.records,
+            columns=['stage', 'site', 'seconds', 'bytes', 'points', 'retries', 'errors'],
+        ).fillna({'site': '*'}).assign(calls=1)
+        if 'stage' not in ([by] if isinstance(by, str) else by):
+            whole = df['stage'] == 'site'
+            df.loc[whole, 'calls'] = 0
+            df.loc[~whole & df['site'].isin(df.loc[whole, 'site']), 'seconds'] = 0.
+        r = df.groupby(by, sort=False)[list(_stage_cols)].sum()
+        if r.index.nlevels > 1:
+            r = r.sort_index(level=0, sort_remaining=False, kind='stable')
+        return r
+
+    def report(self) -> str:
+        """A printable report: the stages, then the slowest sites"""
+        by_site = self.summary('site').drop(index='*', errors='ignore')
+        return '\n'.join([
+            f'Wall time: {self.wall:.3f} s, {len(by_site)} sites',
+            self.summary('stage').to_string(float_format='{:.3f}'.format),
+            'The slowest sites:',
+            by_site.nlargest(10, 'seconds').to_string(float_format='{:.3f}'.format),
+        ])
+
+
+_instrument: 'PipelineStats | None' = None
+_site_var: contextvars.ContextVar = contextvars.ContextVar('site', default=None)
+
+
+@contextmanager
+def instrument(callback: 'Callable[[dict], Any] | None' = None) -> Iterator[PipelineStats]:
+    """
+    Time the stages of the downloads (from all the threads) run inside the block
+
+    Nothing is recorded (at the cost of an `is None` check per stage) outside the block.
+
+    Parameters
+    ----------
+    callback : Callable[[dict], Any] | None, optional, default=None
+        Called with each record as it's added, such as `print` or a logger.
+
+    Returns
+    -------
+    Iterator[PipelineStats]
+
+    Examples
+    --------
+    >>> with instrument() as stats:
+    ...     df = hourly_WU_AQ(site_list, max_workers=8)
+    >>> print(stats.report())
+    >>> stats.summary(['site', 'stage'])
+    """
+    global _instrument
+    prev, _instrument = _instrument, PipelineStats(callback)
+    stats, t0 = _instrument, time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.wall = time.perf_counter() - t0
+        _instrument = prev
+
+
+class _Stage:
+    """Time a block as a stage of the site in `_site_var` (see `instrument`)"""
+    __slots__ = ('stats', 'stage', 'counts', 't0')
+
+    def __init__(self, stats: PipelineStats, stage: str):
+        self.stats, self.stage, self.counts = stats, stage, {}
+
+    def __enter__(self) -> '_Stage':
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is not None:
+            self.counts['errors'] = 1
+        self.stats.add(
+            self.stage, _site_var.get(), time.perf_counter() - self.t0, **self.counts)
+
+    def add(self, **counts) -> None:
+        self.counts |= counts
+
+
+class _NoStage:
+    """The `_Stage` doing nothing outside `instrument()`"""
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoStage':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def add(self, **counts) -> None:
+        pass
+
+
+_no_stage = _NoStage()
+
+
+def _stage(stage: str) -> '_Stage | _NoStage':
+    """`with _stage('decode') as st: ...; st.add(points=n)`, see `PipelineStats`"""
+    return _no_stage if _instrument is None else _Stage(_instrument, stage)
+
+
+def _per_site(fun: Callable) -> Callable:
+    """`fun(site, ...)` recorded as the 'site' stage of `site` under `instrument()`"""
+    def wrapper(site: str, *args, **kwargs):
+        if _instrument is None:
+            return fun(site, *args, **kwargs)
+        token = _site_var.set(site)
+        try:
+            with _stage('site'):
+                return fun(site, *args, **kwargs)
+        finally:
+            _site_var.reset(token)
+    return wrapper
+
+
+class _RateLimiter:
+    """Space out the requests sent to a host by `1 / rate` seconds (thread-safe)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._lock = threading.Lock()
+        self._next = 0.
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            t = max(now, self._next)
+            self._next = t + self.interval
+        if t > now:
+            time.sleep(t - now)
+
+
+_rate_limiters: dict[str, _RateLimiter] = {}
+
+
+def set_rate_limit(rate: 'float | None', host: str = 'aquarius.orc.govt.nz') -> None:
+    """
+    Limit the number of requests per second sent to a host (shared by all threads)
+
+    Parameters
+    ----------
+    rate : float | None
+        The maximum number of requests per second. `None` removes the limit.
+    host : str, default='aquarius.orc.govt.nz'
+        The host name the limit applies to.
+
+    Returns
+    -------
+    None
+    """
+    if rate is None:
+        _rate_limiters.pop(host, None)
+        return
+    if not is_numeric(rate) or rate <= 0:
+        raise ValueError(cp('`rate` must be a positive number!\n', fg=35))
+    _rate_limiters[host] = _RateLimiter(rate)
+
+
+class AquariusClient:
+    """
+    A session for ORC's AQ (Publish v2) reusing pooled, keep-alive connections
+
+    Parameters
+    ----------
+    end_point : str, default='https://aquarius.orc.govt.nz/AQUARIUS/Publish/v2'
+        The Publish v2 end point.
+    basic_auth : str, default='api-read:PR98U3SKOczINoPHo7WM'
+        The '{username}:{password}' used for the basic authentication.
+    maxsize : int, default=10
+        The number of connections kept alive per host. It's raised to the number of
+        threads requesting at once (`max_workers * chunk_workers` of the `*_WU_AQ`
+        wrappers) when more than that - see `ensure_pool_size`.
+    retries : int, default=3
+        The number of retries on connection errors and on status 429/5xx.
+    backoff_factor : float, default=0.5
+        The exponential backoff (in seconds) between retries.
+    timeout : float, default=120
+        The timeout (in seconds) for reading a response (10 seconds for connecting).
+
+    Notes
+    -----
+        * The limit set by `set_rate_limit` applies to the requests sent by a client.
+        * Use it as a context manager (`with AquariusClient() as c: ...`) to close
+          the connections when done.
+    """
+
+    def __init__(
+            self,
+            end_point: str = 'https://aquarius.orc.govt.nz/AQUARIUS/Publish/v2',
+            basic_auth: str = 'api-read:PR98U3SKOczINoPHo7WM',
+            maxsize: int = 10,
+            retries: int = 3,
+            backoff_factor: float = .5,
+            timeout: float = 120.,
+        ):
+        self.end_point = end_point.rstrip('/')
+        self.headers = urllib3.util.make_headers(basic_auth=basic_auth)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self.http = urllib3.PoolManager(
+            maxsize=maxsize,
+            retries=urllib3.Retry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=['GET'],
+            ),
+            timeout=urllib3.Timeout(connect=10., read=timeout),
+        )
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.end_point!r})'
+
+    def __enter__(self) -> 'AquariusClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def url(self, service: str) -> str:
+        """The url of a Publish v2 service, such as 'GetTimeSeriesDescriptionList'"""
+        return f'{self.end_point}/{service}'
+
+    def get(self, url: str, **kwargs) -> urllib3.response.HTTPResponse:
+        """Send a 'GET' request through the pooled connections"""
+        if (limiter := _rate_limiters.get(parse.urlsplit(url).hostname)) is not None:
+            limiter.wait()
+        headers = kwargs.pop('headers', self.headers)
+        with _stage('http') as st:
+            r = self.http.request('GET', url=url, headers=headers, **kwargs)
+            # The bytes read so far: the whole body unless streamed (`preload_content`)
+            st.add(bytes=r.tell(), retries=len(getattr(r.retries, 'history', ())))
+        return r
+
+    def ensure_pool_size(self, n: int) -> None:
+        """
+        Keep alive at least `n` connections per host, for `n` threads requesting at once
+
+        A smaller pool works too, but each connection beyond it is closed after its
+        request (with a 'Connection pool is full' warning) instead of being reused.
+        The pooled connections are closed when the pool is enlarged, so call it before
+        the threads start.
+        """
+        with self._lock:
+            if n > self.maxsize:
+                self.maxsize = n
+                self.http.connection_pool_kw['maxsize'] = n
+                self.http.clear()
+
+    def close(self) -> None:
+        """Close all the pooled connections"""
+        self.http.clear()
+
+
+_default_client: 'AquariusClient | None' = None
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> AquariusClient:
+    """The module-level `AquariusClient` used when no client is passed (created once)"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = AquariusClient()
+    return _default_client
+
+
 def get_AQ(
         url: str,
-        basic_auth: str = 'api-read:PR98U3SKOczINoPHo7WM',
+        basic_auth: str = None,
+        client: AquariusClient = None,
         **kwargs
     ) -> urllib3.response.HTTPResponse:
-    """Connect ORC's AQ using 'GET' verb"""
-    http = urllib3.PoolManager()
-    hdr = urllib3.util.make_headers(basic_auth=basic_auth)
-    return http.request('GET', url=url, headers=hdr, **kwargs)
+    """Connect ORC's AQ using 'GET' verb (through `client`, or `default_client()`)"""
+    if client is None:
+        client = default_client()
+    if basic_auth is not None:
+        kwargs['headers'] = urllib3.util.make_headers(basic_auth=basic_auth)
+    return client.get(url, **kwargs)
+
+
+_path_uid_index = Path(__file__).resolve().parents[1] / 'info' / 'uid_info.json'
+_uid_index: dict[str, str] = {}
+_uid_index_loaded = False
+# {Identifier: (CorrectedStartTime, CorrectedEndTime, `time.monotonic()` received)} of
+# the descriptions received, requested again once older than `_corrected_ttl` seconds
+_corrected_index: dict[str, tuple['str | None', 'str | None', float]] = {}
+_corrected_ttl = 600.
+
+
+def _index_descriptions(ld: list[dict]) -> dict:
+    """{Identifier: UniqueId} of 'TimeSeriesDescriptions', keeping the corrected ranges"""
+    now = time.monotonic()
+    _corrected_index.update({
+        i.get('Identifier'): (i.get('CorrectedStartTime'), i.get('CorrectedEndTime'), now)
+        for i in ld
+    })
+    return {i.get('Identifier'): i.get('UniqueId') for i in ld}
+
+
+def _corrected_fresh(identifier: str) -> bool:
+    """Whether the corrected range of a time series was received in `_corrected_ttl`"""
+    hit = _corrected_index.get(identifier)
+    return hit is not None and time.monotonic() - hit[2] < _corrected_ttl
+
+
+def load_uid_index(path: 'str | Path' = None, ttl_days: float = 30.) -> 'dict | None':
+    """
+    Load the saved {Identifier: UniqueId} index (see `update_uid_index`)
+
+    Parameters
+    ----------
+    path : str | Path, optional, default=None
+        The JSON file of the index - 'info/uid_info.json' by default.
+    ttl_days : float, optional, default=30
+        The index is treated as expired when the file is older than `ttl_days` days.
+
+    Returns
+    -------
+    dict | None
+        * dict: {Identifier: UniqueId}, such as {'Flow.WMHourlyMean@WM0062': '...'}
+        * `None`: the index file doesn't exist or has expired
+    """
+    path = Path(_path_uid_index if path is None else path)
+    if not path.exists():
+        return None
+    if time.time() - path.stat().st_mtime > ttl_days * 86400:
+        print(cp(
+            f'<{path.name}> is older than {ttl_days} days and ignored! '
+            'Refresh it by `update_uid_index()`.\n',
+            fg=34,
+        ))
+        return None
+    return json.loads(path.read_text())
+
 
+def get_uid_index(parameter: str = None, client: AquariusClient = None) -> dict:
+    """
+    Get {Identifier: UniqueId} for all the time series (of a Parameter) in one request
+
+    Parameters
+    ----------
+    parameter : str, optional, default=None
+        The Parameter of the time series, such as 'Flow' or 'Abstraction Volume'.
+        All the time series on the server are listed when `None`.
+    client : AquariusClient, optional, default=None
+        The session used for the request. `default_client()` is used when `None`.
 
-def get_uid(measurement: str, site: str) -> 'str | None':
+    Returns
+    -------
+    dict
+        {Identifier: UniqueId}, such as {'Flow.WMHourlyMean@WM0062': '...'}
+    """
+    if client is None:
+        client = default_client()
+    query_dict = {} if parameter is None else {'Parameter': parameter}
+    r = get_AQ(
+        url=client.url('GetTimeSeriesDescriptionList'), client=client, fields=query_dict,
+    )
+    ld = json.loads(r.data.decode('utf-8')).get('TimeSeriesDescriptions') or []
+    return _index_descriptions(ld)
+
+
+def update_uid_index(path: 'str | Path' = None, client: AquariusClient = None) -> dict:
+    """
+    Refresh the {Identifier: UniqueId} index of the whole server and save it as JSON
+
+    Parameters
+    ----------
+    path : str | Path, optional, default=None
+        The JSON file of the index - 'info/uid_info.json' by default.
+    client : AquariusClient, optional, default=None
+        The session used for the request. `default_client()` is used when `None`.
+
+    Returns
+    -------
+    dict
+        {Identifier: UniqueId} of all the time series on the server.
+    """
+    global _uid_index_loaded
+    uid_dict = get_uid_index(client=client)
+    path = Path(_path_uid_index if path is None else path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w') as fo:
+        json.dump(uid_dict, fo, indent=4)
+    _uid_index.update(uid_dict)
+    _uid_index_loaded = True
+    return uid_dict
+
+
+def _uid_lookup(identifier: str) -> 'str | None':
+    """Look up the in-memory index (loaded from 'info/uid_info.json' on the first call)"""
+    global _uid_index_loaded
+    if not _uid_index_loaded:
+        _uid_index_loaded = True
+        if (d := load_uid_index()) is not None:
+            _uid_index.update({k: v for k, v in d.items() if k not in _uid_index})
+    return _uid_index.get(identifier)
+
+
+def resolve_uids(
+        measurement: str,
+        site_list: 'str | list[str]',
+        client: AquariusClient = None,
+        corrected_range: bool = False
+    ) -> dict:
+    """
+    Get UniqueId for many sites - one request for all those not indexed yet
+
+    Parameters
+    ----------
+    measurement : str
+        The format of {Parameter}.{Label}, such as 'Flow.WMHourlyMean'.
+    site_list : str | list[str]
+        A list of {LocationIdentifier}, such as ['WM0062', 'WM0063']
+    client : AquariusClient, optional, default=None
+        The session used for the request. `default_client()` is used when `None`.
+    corrected_range : bool, optional, default=False
+        Also take the sites whose 'CorrectedStartTime' & 'CorrectedEndTime' are not
+        received in the last `_corrected_ttl` seconds as missing, such as those indexed
+        by 'info/uid_info.json' only. The ranges are used by `get_ts_AQ` with `chunk`
+        (and no `date_start`).
+
+    Returns
+    -------
+    dict
+        {site: UniqueId}, where UniqueId is `None` when it cannot be located.
+
+    Notes
+    -----
+        When more than one site is missing from the index, the descriptions of the
+        Parameter are requested once and merged into the index. Otherwise, the
+        missing site is resolved by `get_uid`.
+    """
+    if isinstance(site_list, str):
+        site_list = [site_list]
+    missing = [
+        i for i in site_list
+        if _uid_lookup(ms := f'{measurement}@{i}') is None
+        or (corrected_range and not _corrected_fresh(ms))
+    ]
+    if len(missing) > 1:
+        parameter, _ = measurement.split('.')
+        _uid_index.update(get_uid_index(parameter, client))
+    return {
+        site: _uid_index.get(f'{measurement}@{site}') or (
+            get_uid(measurement, site, client) if len(missing) == 1 else None)
+        for site in site_list
+    }
+
+
+def get_uid(
+        measurement: str,
+        site: str,
+        client: AquariusClient = None
+    ) -> 'str | None':
     """
     Get UniqueId <- f'{measurement}@{site}'
 
@@ -306,32 +1054,43 @@ def get_uid(measurement: str, site: str) -> 'str | None':
         The {LocationIdentifier} behind a site name, such as:
             * WM0062
             * FA780
+    client : AquariusClient, optional, default=None
+        The session used for the request. `default_client()` is used when `None`.
 
     Returns
     -------
     str | None
         * str: UniqueId str used for requesting time series (Aquarius)
         * `None`: the UniqueId cannot be located
+
+    Notes
+    -----
+        The in-memory index (see `resolve_uids` and `update_uid_index`) is looked up
+        first, and a request is only sent for a time series not indexed yet.
     """
     if not site.strip():
         raise ValueError(cp("Provide a correct string value for 'Site'!\n", fg=35))
-    end_point = 'https://aquarius.orc.govt.nz/AQUARIUS/Publish/v2'
-    url_desc = f'{end_point}/GetTimeSeriesDescriptionList'
     ms = f'{measurement}@{site}'
+    if (uid := _uid_lookup(ms)) is not None:
+        return uid
+    if client is None:
+        client = default_client()
+    url_desc = client.url('GetTimeSeriesDescriptionList')
     parameter, _ = measurement.split('.')
     query_dict = {'LocationIdentifier': site, 'Parameter': parameter}
-    r = get_AQ(url=url_desc, fields=query_dict)
+    r = get_AQ(url=url_desc, client=client, fields=query_dict)
     if not (ld := json.loads(r.data.decode('utf-8')).get('TimeSeriesDescriptions')):
         return None
-    j_list = [i for i, v in enumerate(ld) if v['Identifier'] == ms]
-    return ld[j_list[0]].get('UniqueId', None) if j_list else None
+    _uid_index.update(_index_descriptions(ld))
+    return _uid_index.get(ms)
 
 
 def get_url_AQ(
         measurement: str,
         site: str,
         date_start: int = None,
-        date_end: int = None
+        date_end: int = None,
+        client: AquariusClient = None
     ) -> 'str | None':
     """
     Generate the url for requesting time series
@@ -352,14 +1111,23 @@ def get_url_AQ(
     date_end : int, optional, default=None
         End date of the request data date. It follows '%Y%m%d' When specified.
         Otherwise, request the data till its end.
+    client : AquariusClient, optional, default=None
+        The session used for the request. `default_client()` is used when `None`.
 
     Returns
     -------
     str | None
         A string of the url for requesting time series.
     """
-    if (uid := get_uid(measurement, site)) is None:
+    if client is None:
+        client = default_client()
+    if (uid := get_uid(measurement, site, client)) is None:
         return None
+    return _url_ts(uid, *_query_window(date_start, date_end), client)
+
+
+def _query_window(date_start: int = None, date_end: int = None) -> tuple[str, str]:
+    """The (QueryFrom, QueryTo) strings for the dates in '%Y%m%d' (see `get_url_AQ`)"""
     fmt = '%Y-%m-%dT00:00:00.0000000+12:00'
     ds = '1800-01-01T00:00:00.0000000+12:00' if date_start is None else (
         datetime.datetime.strptime(f'{date_start}', '%Y%m%d').strftime(fmt))
@@ -367,41 +1135,451 @@ def get_url_AQ(
         datetime.datetime.now() + datetime.timedelta(days=1) if date_end is None else
         datetime.datetime.strptime(f'{date_end}', '%Y%m%d') + datetime.timedelta(days=1)
     ).strftime(fmt)
-    end_point = 'https://aquarius.orc.govt.nz/AQUARIUS/Publish/v2'
+    return ds, de
+
+
+def _url_ts(uid: str, query_from: str, query_to: str, client: AquariusClient) -> str:
+    """The url of 'GetTimeSeriesCorrectedData' for a UniqueId and a query window"""
     query_dict = {
         'TimeSeriesUniqueId': uid,
-        'QueryFrom': ds,
-        'QueryTo': de,
+        'QueryFrom': query_from,
+        'QueryTo': query_to,
         'GetParts': 'PointsOnly',
     }
     q_str = parse.urlencode(query_dict)
-    return f'{end_point}/GetTimeSeriesCorrectedData?{q_str}'
+    return f"{client.url('GetTimeSeriesCorrectedData')}?{q_str}"
+
+
+_ts_col_dtype = {'Timestamp': str, 'Value': float}
+
+
+_re_points = re.compile(r'"Points"\s*:\s*\[')
+_re_sep = re.compile(r'[\s,]*')
+
+
+def _read_points(
+        r: urllib3.response.HTTPResponse,
+        chunk_size: int = 1 << 20
+    ) -> 'pd.DataFrame | None':
+    """
+    Decode the `Points` of a streamed 'GetTimeSeriesCorrectedData' response
+
+    The points are decoded one at a time from a buffer of at most a chunk or so, and
+    each value goes straight into a NumPy array. Neither the whole body nor the list of
+    point dicts is held in memory. `None` returned when there are no points.
+    """
+    chunks = r.stream(chunk_size)
+    text = codecs.getincrementaldecoder('utf-8')()
+    decoder = json.JSONDecoder()
+    buf = ''
+    while (m := _re_points.search(buf)) is None:
+        if (chunk := next(chunks, None)) is None:
+            return None
+        buf += text.decode(chunk)
+    pos, n = m.end(), 0
+    ts, value = [], np.empty(1 << 12)
+    while True:
+        pos = _re_sep.match(buf, pos).end()
+        if pos < len(buf):
+            if buf[pos] == ']':
+                break
+            try:
+                p, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                pass  # An incomplete point - read the next chunk
+            else:
+                if n == value.size:
+                    value = np.concatenate([value, np.empty(n)])
+                ts.append(p['Timestamp'])
+                value[n] = (p.get('Value') or {}).get('Numeric', np.nan)
+                n += 1
+                continue
+        if (chunk := next(chunks, None)) is None:
+            raise ValueError(cp('Incomplete response of the time series!\n', fg=35))
+        buf = buf[pos:] + text.decode(chunk)
+        pos = 0
+    if not n:
+        return None
+    return pd.DataFrame({'Timestamp': ts, 'Value': value[:n]}).astype(_ts_col_dtype)
+
+
+def _get_points(url: str, client: AquariusClient = None) -> 'pd.DataFrame | None':
+    """Request the points of a url by `_url_ts` (`None` returned when no points)"""
+    r = get_AQ(url=url, client=client, preload_content=False)
+    try:
+        with _stage('decode') as st:
+            ts = _read_points(r)
+            st.add(bytes=r.tell(), points=0 if ts is None else ts.shape[0])
+        return ts
+    finally:
+        r.drain_conn()
+        r.release_conn()
+
+
+def _get_points_range(
+        uid: str,
+        query_from: str,
+        query_to: str,
+        client: AquariusClient = None,
+        chunk: str = None,
+        chunk_workers: int = 4,
+        checkpoint_dir: 'str | Path' = None,
+        chunk_range: 'tuple[str | None, str | None]' = (None, None)
+    ) -> 'pd.DataFrame | None':
+    """
+    Request the points of a UniqueId from `query_from` to `query_to`, window by window
+
+    With `chunk` (a pandas frequency, such as 'YS' for yearly windows), the windows are
+    requested in parallel by `chunk_workers` threads and stitched in order. The windows
+    are split within `chunk_range` only (the 'CorrectedStartTime' & 'CorrectedEndTime'
+    of the time series, if known), while the first and the last windows still reach
+    `query_from` and `query_to`, so that no point is lost if the range is outdated. With
+    `checkpoint_dir`, each completed window is saved as '{checkpoint_dir}/{uid}/*.parquet'
+    until all the windows are done, so a failed run only requests the missing windows
+    next time. `None` returned when there are no points.
+    """
+    if chunk is None:
+        return _get_points(_url_ts(uid, query_from, query_to, client), client)
+    (default_client() if client is None else client).ensure_pool_size(chunk_workers)
+    t0, t1 = pd.Timestamp(query_from), pd.Timestamp(query_to)
+    a = t0 if chunk_range[0] is None else max(t0, pd.Timestamp(chunk_range[0]))
+    b = t1 if chunk_range[1] is None else min(t1, pd.Timestamp(chunk_range[1]))
+    edges = [t0, *(t for t in pd.date_range(a, b, freq=chunk) if t0 < t < t1), t1]
+    path = None if checkpoint_dir is None else Path(checkpoint_dir) / uid
+
+    def fetch(t_from: pd.Timestamp, t_to: pd.Timestamp) -> pd.DataFrame:
+        if path is not None:
+            path_chunk = path / f'{t_from:%Y%m%dT%H%M%S}_{t_to:%Y%m%dT%H%M%S}.parquet'
+            if path_chunk.exists():
+                return pd.read_parquet(path_chunk)
+        url = _url_ts(uid, t_from.isoformat(), t_to.isoformat(), client)
+        if (ts := _get_points(url, client)) is None:
+            ts = pd.DataFrame(columns=_ts_col_dtype.keys()).astype(_ts_col_dtype)
+        if path is not None:
+            path.mkdir(parents=True, exist_ok=True)
+            ts.to_parquet(path_chunk.with_suffix('.tmp'), index=False)
+            path_chunk.with_suffix('.tmp').replace(path_chunk)
+        return ts
+
+    with ThreadPoolExecutor(max_workers=chunk_workers) as pool:
+        # The windows are recorded under the site of the caller (see `instrument`)
+        fut_list = [
+            pool.submit(contextvars.copy_context().run, fetch, a, b)
+            for a, b in zip(edges[:-1], edges[1:])
+        ]
+    for fut in fut_list:
+        if (e := fut.exception()) is not None:
+            raise e
+    if path is not None:
+        shutil.rmtree(path, ignore_errors=True)
+    if not (lst := [i for fut in fut_list if (i := fut.result()).shape[0]]):
+        return None
+    # The points on the edges are requested by both of the windows next to them
+    return (
+        pd.concat(lst, axis=0, ignore_index=True)
+        .drop_duplicates(subset='Timestamp', ignore_index=True)
+    )
+
+
+def _corrected_range(
+        measurement: str,
+        site: str,
+        client: AquariusClient = None
+    ) -> tuple['str | None', 'str | None']:
+    """
+    The ('CorrectedStartTime', 'CorrectedEndTime') of f'{measurement}@{site}' (`None` if
+    not available), requested only if not received by `resolve_uids` or `get_uid` in the
+    last `_corrected_ttl` seconds
+    """
+    ms = f'{measurement}@{site}'
+    if not _corrected_fresh(ms):
+        if client is None:
+            client = default_client()
+        parameter, _ = measurement.split('.')
+        query_dict = {'LocationIdentifier': site, 'Parameter': parameter}
+        url_desc = client.url('GetTimeSeriesDescriptionList')
+        r = get_AQ(url=url_desc, client=client, fields=query_dict)
+        ld = json.loads(r.data.decode('utf-8')).get('TimeSeriesDescriptions') or []
+        _uid_index.update(_index_descriptions(ld))
+    return _corrected_index.get(ms, (None, None, 0.))[:2]
+
+
+def _get_ts_cached(
+        uid: str,
+        cache_dir: 'str | Path',
+        revise_days: float = 0.,
+        client: AquariusClient = None,
+        query_from: str = None,
+        **kwargs
+    ) -> 'pd.DataFrame | None':
+    """
+    Get the whole record of a UniqueId, only requesting the points after the cached ones
+
+    The cache is '{cache_dir}/{uid}.parquet'. The points from `revise_days` days before
+    the last cached point onwards are requested again (to pick up the corrections), and
+    `revise_days=np.inf` re-downloads the whole record (from `query_from` if specified).
+    Other keyword arguments are passed to `_get_points_range`.
+    """
+    path = Path(cache_dir) / f'{uid}.parquet'
+    ts = pd.read_parquet(path) if path.exists() else None
+    query_start, query_to = _query_window()
+    query_from = query_start if query_from is None else query_from
+    if ts is not None and ts.shape[0] and np.isfinite(revise_days):
+        last = ts['Timestamp'].iat[-1]
+        t = (
+            datetime.datetime.strptime(clean_24h_datetime(last), '%Y-%m-%dT%H:%M:%S')
+            - datetime.timedelta(days=revise_days)
+        )
+        query_from = t.strftime('%Y-%m-%dT%H:%M:%S') + last[19:]
+        # The same moment written as 'T24:00:00' (of the previous day) sorts earlier
+        cut = query_from[:19] if query_from[11:19] != '00:00:00' else (
+            (t - datetime.timedelta(days=1)).strftime('%Y-%m-%dT24:00:00'))
+        ts = ts.iloc[:ts['Timestamp'].str[:19].searchsorted(cut)]
+    else:
+        ts = None
+    new = _get_points_range(uid, query_from, query_to, client, **kwargs)
+    if new is None and ts is None:
+        return None
+    ts = pd.concat([i for i in (ts, new) if i is not None], axis=0, ignore_index=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path_tmp = path.with_suffix('.tmp')
+    ts.to_parquet(path_tmp, index=False)
+    path_tmp.replace(path)
+    return ts
+
+
+def get_points_AQ(
+        uid: str,
+        query_from: str = None,
+        query_to: str = None,
+        client: AquariusClient = None,
+        **kwargs
+    ) -> 'pd.DataFrame | None':
+    """
+    Get the raw points of a UniqueId over a period ('GetTimeSeriesCorrectedData')
+
+    Parameters
+    ----------
+    uid : str
+        The UniqueId of the time series.
+    query_from, query_to : str, optional, default=None
+        The QueryFrom and QueryTo, such as '2020-01-01T00:00:00.0000000+12:00'.
+        The whole record when `None` (from 1800-01-01 to tomorrow).
+    client : AquariusClient, optional, default=None
+        The session used for the requests. `default_client()` is used when `None`.
+    **kwargs
+        `chunk`, `chunk_workers` and `checkpoint_dir` - see `get_ts_AQ`.
+
+    Returns
+    -------
+    pd.DataFrame | None
+        The points in columns ['Timestamp', 'Value'], or `None` if there are none.
+    """
+    query_start, query_end = _query_window()
+    return _get_points_range(
+        uid,
+        query_start if query_from is None else query_from,
+        query_end if query_to is None else query_to,
+        client, **kwargs,
+    )
+
+
+_path_report_setting = Path(__file__).resolve().parents[1] / 'report_setting'
+
+# 'Statistic' of a ProcessChain -> the pandas frequency & the aggregation
+_stat_period = {
+    'Minutes': 'min', 'Hourly': 'h', 'Daily': 'D', 'Weekly': 'W-SUN',
+    'Monthly': 'MS', 'Annual': 'YS',
+}
+_stat_type = {'Mean': 'mean', 'Sum': 'sum', 'Min': 'min', 'Max': 'max', 'Count': 'count'}
+
+
+def agg_spec(agg: 'str | Path | dict | list[dict] | None') -> list[dict]:
+    """
+    The ProcessChain (of the report templates) for an aggregation spec
+
+    Parameters
+    ----------
+    agg : str | Path | dict | list[dict] | None
+        * A report template, by name (such as 'monthly_sum' in <report_setting>) or path
+        * A 'Statistic', such as {'Period': 'Monthly', 'StatType': 'Sum'}, where
+          'PeriodCount' (1), 'RequireMinimumDataCoverage' (False) and
+          'BinAnchorOffsetPeriod' ('00-00 00:00') are optional
+        * A ProcessChain (a list of the above), or `None` for the raw data
+
+    Returns
+    -------
+    list[dict]
+        An empty list (the raw data), or a single 'Statistic'.
+
+    Notes
+    -----
+        The chain is evaluated on the client (`apply_process_chain`) after all the raw
+        points are downloaded: Publish v2 has no aggregation (ProcessChain) of its own,
+        so aggregating on the server to cut the bytes transferred is out of scope.
+    """
+    if agg is None:
+        return []
+    if isinstance(agg, (str, Path)):
+        path = Path(agg)
+        if not path.suffix and not path.exists():
+            path = _path_report_setting / f'{path}.json'
+        param = json.loads(path.read_text()).get('Parameters', {})
+        agg = json.loads(param.get('Input1', {}).get('Value', '{}')).get('ProcessChain', [])
+    chain = [agg] if isinstance(agg, dict) else list(agg)
+    chain = [{'ProcessType': 'Statistic', 'PeriodCount': 1} | i for i in chain]
+    if len(chain) > 1 or any(
+        i['ProcessType'] != 'Statistic'
+        or i.get('Period') not in _stat_period or i.get('StatType') not in _stat_type
+        for i in chain
+    ):
+        raise ValueError(cp(
+            f'Only a single Statistic (Period in {list(_stat_period)}, StatType in '
+            f'{list(_stat_type)}) is supported! Got {chain}\n',
+            fg=35,
+        ))
+    return chain
+
+
+def apply_process_chain(
+        ts: pd.Series,
+        process_chain: 'list[dict] | dict | str | None'
+    ) -> pd.Series:
+    """
+    Apply the ProcessChain of a report template to a Timestamp-indexed pd.Series
+
+    Parameters
+    ----------
+    ts : pd.Series
+        The raw time series indexed by time.
+    process_chain : list[dict]
+        Empty (raw data), or a single 'Statistic', such as
+        {'StatType': 'Mean', 'Period': 'Daily', 'PeriodCount': 1,
+         'RequireMinimumDataCoverage': False, 'BinAnchorOffsetPeriod': '00-00 00:00'}.
+        Or any other spec of `agg_spec`.
+
+    Returns
+    -------
+    pd.Series
+        The statistics labelled by the start of each period. A period without values is
+        left out, as well as a period not fully covered when 'RequireMinimumDataCoverage'.
+
+    Notes
+    -----
+        The statistics are of the points within the periods - not weighted by time as
+        ReportRunner may do for irregular time series.
+    """
+    ts = ts.dropna()
+    if not (process_chain := agg_spec(process_chain)) or ts.empty:
+        return ts
+    p = process_chain[0]
+    freq, fun = _stat_period[p['Period']], _stat_type[p['StatType']]
+    # 'MM-DD HH:MM' - only the days/hours/minutes are used as the offset of the periods
+    month, day, hour, minute = (
+        int(i) for i in p.get('BinAnchorOffsetPeriod', '00-00 00:00').replace(' ', ':')
+        .replace('-', ':').split(':')
+    )
+    if month:
+        raise ValueError(cp('A month offset of the periods is not supported!\n', fg=35))
+    rule = f"{p.get('PeriodCount', 1)}{freq}"
+    offset = pd.Timedelta(days=day, hours=hour, minutes=minute)
+    g = ts.resample(rule, offset=offset, closed='left', label='left')
+    n = g.count()
+    r = getattr(g, fun)()[n > 0]
+    if p.get('RequireMinimumDataCoverage') and (step := ts_step(ts)) not in {-1, None}:
+        idx = r.index
+        sec = ((idx + pd.tseries.frequencies.to_offset(rule)) - idx).total_seconds()
+        r = r[n[idx].to_numpy() * step >= sec]
+    return r
 
 
 def get_ts_AQ(
         measurement: str,
         site: str,
         date_start: int = None,
-        date_end: int = None
+        date_end: int = None,
+        client: AquariusClient = None,
+        cache_dir: 'str | Path' = None,
+        revise_days: float = 0.,
+        chunk: str = None,
+        chunk_workers: int = 4,
+        checkpoint_dir: 'str | Path' = None,
+        agg: 'str | dict | list[dict]' = None
     ) -> pd.DataFrame:
-    """Get the time series for a single site specified by those defined in `get_url_AQ`"""
-    col_dtype = {'Timestamp': str, 'Value': float}
-    empty_df = pd.DataFrame(columns=col_dtype.keys()).astype(col_dtype)
-    if (url := get_url_AQ(measurement, site, date_start, date_end)) is None:
+    """
+    Get the time series for a single site specified by those defined in `get_url_AQ`
+
+    Parameters
+    ----------
+    measurement, site, date_start, date_end, client :
+        See `get_url_AQ`.
+    cache_dir : str | Path, optional, default=None
+        The folder caching the whole record of each time series as
+        '{UniqueId}.parquet'. Only the points after the last cached one are requested.
+        The cache is used when neither `date_start` nor `date_end` is specified.
+    revise_days : float, optional, default=0
+        The trailing window (in days) of the cached record requested again to pick up
+        the corrected data. `np.inf` re-downloads the whole record.
+    chunk : str, optional, default=None
+        Split the requested period into windows of a pandas frequency, such as 'YS'
+        (yearly) or '5YS' (every 5 years). One request for the whole period if `None`.
+        When `date_start` is `None`, the windows are split from the
+        'CorrectedStartTime' to the 'CorrectedEndTime' of the time series (one request
+        in a whole if they're not available), with the first and the last windows
+        reaching the whole period. The `*_WU_AQ` wrappers get both for all the sites in
+        the request of `resolve_uids`.
+    chunk_workers : int, optional, default=4
+        The number of windows requested in parallel.
+    checkpoint_dir : str | Path, optional, default=None
+        The folder keeping the completed windows until all of them are done, so that a
+        failed request only needs the missing windows the next time.
+    agg : str | dict | list[dict], optional, default=None
+        Resample the time series on the client as a report template does, such as
+        'monthly_sum' (in <report_setting>) or {'Period': 'Monthly', 'StatType': 'Sum'}
+        - see `agg_spec`. It does NOT reduce the data transferred: Publish v2
+        (`GetTimeSeriesCorrectedData`) has no server-side aggregation, so all the raw
+        points are still downloaded and then aggregated here. Use `cache_dir` so that
+        the raw points are downloaded only once for different aggregations.
+
+    Returns
+    -------
+    pd.DataFrame
+        The raw time series in columns ['Timestamp', 'Value'], or the aggregated one
+        (labelled by the start of the periods in '%Y-%m-%dT%H:%M:%S') when `agg`.
+    """
+    chain = agg_spec(agg)
+    empty_df = pd.DataFrame(columns=_ts_col_dtype.keys()).astype(_ts_col_dtype)
+    with _stage('uid'):
+        uid = get_uid(measurement, site, client)
+    if uid is None:
         print(cp(
             f'\n[{measurement}@{site}] -> No data! An empty column [{site}] added!\n',
             fg=34
         ))
         return empty_df
-    r = get_AQ(url=url)
-    if not (ld := json.loads(r.data.decode('utf-8')).get('Points', None)):
+    query_from, query_to = _query_window(date_start, date_end)
+    kw = {'chunk': chunk, 'chunk_workers': chunk_workers, 'checkpoint_dir': checkpoint_dir}
+    if chunk is not None and date_start is None:
+        # No empty windows before the first point or after the last one
+        if (t_range := _corrected_range(measurement, site, client))[0] is None:
+            kw['chunk'] = None
+        else:
+            kw['chunk_range'] = t_range
+    if cache_dir is not None and date_start is None and date_end is None:
+        ts = _get_ts_cached(uid, cache_dir, revise_days, client, query_from, **kw)
+    else:
+        ts = _get_points_range(uid, query_from, query_to, client, **kw)
+    if ts is None:
         print(cp(f'[{measurement}@{site}] -> No data over the chosen period!\n', fg=34))
         return empty_df
-    return (
-        pd.json_normalize(ld, sep='_')
-        .rename(columns={'Value_Numeric': 'Value'})
-        .astype(col_dtype)
-    )
+    if chain:
+        with _stage('timestamps'):
+            t = parse_24h_datetime(ts['Timestamp'])
+        r = apply_process_chain(pd.Series(ts['Value'].to_numpy(), index=t), chain)
+        return pd.DataFrame({
+            'Timestamp': r.index.strftime('%Y-%m-%dT%H:%M:%S'), 'Value': r.to_numpy(),
+        }).astype(_ts_col_dtype)
+    return ts
 
 
 def clean_24h_datetime(shit_datetime: str) -> str:
@@ -430,36 +1608,288 @@ def clean_24h_datetime(shit_datetime: str) -> str:
     ).strftime('%Y-%m-%dT%H:%M:%S') if H > 23 else s19
 
 
+def parse_24h_datetime(ts: 'pd.Series | np.ndarray | list[str]') -> pd.DatetimeIndex:
+    """
+    Vectorised `pd.to_datetime(pd.Series(ts).apply(clean_24h_datetime))`
+
+    Parameters
+    ----------
+    ts : pd.Series | np.ndarray | list[str]
+        Datetime strings whose first 19 characters follow '%Y-%m-%dT%H:%M:%S', where the
+        hour can be 24 (such as '2020-12-31T24:00:00.0000000+12:00').
+
+    Returns
+    -------
+    pd.DatetimeIndex
+        The (timezone-naive) datetime, identical to that by `clean_24h_datetime`.
+
+    Notes
+    -----
+        The digits are read from the bytes of the first 19 characters as a 2-D array,
+        and the hour 24 rolls over by adding the hours (in seconds) to the date.
+        Any input which cannot be read this way falls back to `clean_24h_datetime`, so
+        does a year near or out of the bounds of 'datetime64[ns]' (raising an error as
+        `pd.to_datetime` does).
+    """
+    s = pd.Series(ts, copy=False)
+    if not s.size:
+        return pd.DatetimeIndex([], dtype='datetime64[ns]', name=s.name)
+    v = s.to_numpy(dtype=object)
+    if (na := s.isna().to_numpy()).any():
+        v = v.copy()
+        v[na] = '1970-01-01T00:00:00'
+    try:
+        b = v.astype('S19').view(np.uint8).reshape(-1, 19)
+    except (UnicodeEncodeError, TypeError, ValueError):
+        b = None
+    if b is not None:
+        d = b[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]].astype(np.int64) - 48
+        Y = d[:, 0] * 1000 + d[:, 1] * 100 + d[:, 2] * 10 + d[:, 3]
+        M, D, H, Mi, S = (d[:, i] * 10 + d[:, i + 1] for i in range(4, 14, 2))
+        month = (Y - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (M - 1)
+        day = month.astype('datetime64[D]') + (D - 1)
+        if (
+            ((d >= 0) & (d <= 9)).all()
+            and (b[:, [4, 7, 10, 13, 16]] == np.frombuffer(b'--T::', np.uint8)).all()
+            and ((M >= 1) & (M <= 12) & (D >= 1)).all()
+            and (day.astype('datetime64[M]') == month).all()
+            and ((H <= 24) & (Mi <= 59) & (S <= 59)).all()
+            # Within the years of 'datetime64[ns]' (1677-09-21 to 2262-04-11)
+            and ((Y >= 1678) & (Y <= 2261)).all()
+        ):
+            t = (day.astype('datetime64[s]') + (H * 3600 + Mi * 60 + S)).astype('<M8[ns]')
+            t[na] = np.datetime64('NaT')
+            return pd.DatetimeIndex(t, name=s.name)
+    return pd.DatetimeIndex(pd.to_datetime(s.apply(clean_24h_datetime)), name=s.name)
+
+
 def _HWU_AQ(
         site: str,
         date_start: int = None,
         date_end: int = None,
-        raw_data: bool = False
+        raw_data: bool = False,
+        client: AquariusClient = None,
+        **kwargs
     ) -> pd.DataFrame:
     """Get hourly rate for a single water meter (from Aquarius)"""
-    ts_raw = get_ts_AQ('Flow.WMHourlyMean', site, date_start, date_end)
+    ts_raw = get_ts_AQ('Flow.WMHourlyMean', site, date_start, date_end, client, **kwargs)
     if raw_data:
         return ts_raw
-    return pd.DataFrame(
-        {site: ts_raw['Value'].values / 1e3},
-        index=ts_raw['Timestamp'].apply(clean_24h_datetime).pipe(pd.to_datetime),
-    ).rename_axis(index='Time').pipe(na_ts_insert)
+    with _stage('timestamps'):
+        t = parse_24h_datetime(ts_raw['Timestamp'])
+    with _stage('pad'):
+        return pd.DataFrame(
+            {site: ts_raw['Value'].values / 1e3}, index=t
+        ).rename_axis(index='Time').pipe(na_ts_insert)
 
 
 def _DWU_AQ(
         site: str,
         date_start: int = None,
         date_end: int = None,
-        raw_data: bool = False
+        raw_data: bool = False,
+        client: AquariusClient = None,
+        **kwargs
     ) -> pd.DataFrame:
     """Get daily rate for a single water meter (from Aquarius)"""
-    ts_raw = get_ts_AQ('Abstraction Volume.WMDaily', site, date_start, date_end)
+    ts_raw = get_ts_AQ(
+        'Abstraction Volume.WMDaily', site, date_start, date_end, client, **kwargs)
     if raw_data:
         return ts_raw
-    return pd.DataFrame(
-        {site: ts_raw['Value'].values / 86400},
-        index=ts_raw['Timestamp'].apply(clean_24h_datetime).pipe(pd.to_datetime)
-    ).rename_axis(index='Date').pipe(na_ts_insert)
+    with _stage('timestamps'):
+        t = parse_24h_datetime(ts_raw['Timestamp'])
+    with _stage('pad'):
+        return pd.DataFrame(
+            {site: ts_raw['Value'].values / 86400}, index=t
+        ).rename_axis(index='Date').pipe(na_ts_insert)
+
+
+def _fit_pool(
+        max_workers: int,
+        client: AquariusClient = None,
+        chunk: str = None,
+        chunk_workers: int = 4,
+        **kwargs
+    ) -> None:
+    """Enlarge the pool of `client` for `max_workers` sites of `chunk_workers` windows"""
+    n_thread = max_workers * (chunk_workers if chunk is not None else 1)
+    (default_client() if client is None else client).ensure_pool_size(n_thread)
+
+
+def _fetch_sites(
+        fun: Callable,
+        site_list: list[str],
+        max_workers: int = 1,
+        **kwargs
+    ) -> tuple[dict, dict]:
+    """
+    Run `fun(site, **kwargs)` for each site, concurrently when `max_workers > 1`
+
+    Returns `({site: result}, {site: exception})`, both following the order of
+    `site_list`. A failed site is reported and collected instead of aborting the batch.
+    """
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError(cp('`max_workers` must be a positive integer!\n', fg=35))
+    _fit_pool(max_workers, **kwargs)
+    fun = _per_site(fun)
+    res, err = {}, {}
+    if max_workers == 1 or len(site_list) < 2:
+        for site in site_list:
+            try:
+                res[site] = fun(site, **kwargs)
+            except Exception as e:
+                err[site] = e
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            fut_site = {pool.submit(fun, site, **kwargs): site for site in site_list}
+            for fut in as_completed(fut_site):
+                try:
+                    res[fut_site[fut]] = fut.result()
+                except Exception as e:
+                    err[fut_site[fut]] = e
+    for site, e in err.items():
+        print(cp(f'[{site}] -> Failed! {type(e).__name__}: {e}\n', fg=35))
+    order = {site: i for i, site in enumerate(site_list)}
+    return (
+        dict(sorted(res.items(), key=lambda kv: order[kv[0]])),
+        dict(sorted(err.items(), key=lambda kv: order[kv[0]])),
+    )
+
+
+def _iter_sites(
+        fun: Callable,
+        site_list: list[str],
+        max_workers: int = 1,
+        failed: 'dict | None' = None,
+        **kwargs
+    ) -> Iterator[tuple[str, Any]]:
+    """
+    Yield `(site, fun(site, **kwargs))` in the order of completion, with at most
+    `max_workers` sites in flight - the streaming counterpart of `_fetch_sites`
+
+    A failed site is reported (and collected in `failed`, if given) instead of aborting.
+    The sites not started yet are cancelled when the generator is closed early.
+    """
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError(cp('`max_workers` must be a positive integer!\n', fg=35))
+    _fit_pool(max_workers, **kwargs)
+    fun = _per_site(fun)
+
+    def fail(site: str, e: Exception) -> None:
+        print(cp(f'[{site}] -> Failed! {type(e).__name__}: {e}\n', fg=35))
+        if failed is not None:
+            failed[site] = f'{type(e).__name__}: {e}'
+
+    if max_workers == 1:
+        for site in site_list:
+            try:
+                r = fun(site, **kwargs)
+            except Exception as e:
+                fail(site, e)
+                continue
+            yield site, r
+        return
+    it = iter(site_list)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {
+            pool.submit(fun, site, **kwargs): site for site in islice(it, max_workers)
+        }
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    site = pending.pop(fut)
+                    # Keep the workers busy while the result is consumed
+                    if (site_next := next(it, None)) is not None:
+                        pending[pool.submit(fun, site_next, **kwargs)] = site_next
+                    try:
+                        r = fut.result()
+                    except Exception as e:
+                        fail(site, e)
+                        continue
+                    yield site, r
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+
+def fetch_concurrently(
+        fun: Callable,
+        key_list: list[str],
+        max_workers: int = 1,
+        **kwargs
+    ) -> tuple[dict, dict]:
+    """
+    Run `fun(key, **kwargs)` for each site (or UniqueId), concurrently by `max_workers`
+    threads, recording each of them under its key (see `instrument`)
+
+    Returns
+    -------
+    tuple[dict, dict]
+        `({key: result}, {key: exception})`, both in the order of `key_list`. A failed
+        key is reported and collected instead of aborting the others.
+    """
+    return _fetch_sites(fun, key_list, max_workers, **kwargs)
+
+
+def _WU_AQ(
+        fun: Callable,
+        measurement: str,
+        site_list: 'str | list[str]',
+        date_start: int = None,
+        date_end: int = None,
+        raw_data: bool = False,
+        max_workers: int = 1,
+        client: AquariusClient = None,
+        backend: str = 'pandas',
+        **kwargs
+    ) -> 'pd.DataFrame | pl.DataFrame | SiteSeriesStore':
+    """Shared body of `hourly_WU_AQ` and `daily_WU_AQ`"""
+    if backend == 'store' and raw_data:
+        raise ValueError(cp("`raw_data` is not available for backend='store'!\n", fg=35))
+    fpl, _ = _polars(None, 'pandas' if backend == 'store' else backend)
+    if isinstance(site_list, str):
+        site_list = [site_list]
+    site_list = list(dict.fromkeys(site_list))
+    # The ranges of the time series are needed for `chunk` (see `get_ts_AQ`)
+    with_range = kwargs.get('chunk') is not None and date_start is None
+    try:
+        with _stage('uid'):
+            resolve_uids(measurement, site_list, client, with_range)
+    except Exception as e:
+        print(cp(f'Bulk UniqueId lookup failed ({e}) -> resolved site by site!\n', fg=34))
+    d, err = _fetch_sites(
+        fun, site_list, max_workers,
+        date_start=date_start, date_end=date_end, raw_data=raw_data, client=client,
+        **kwargs,
+    )
+    if fpl is not None:
+        if not d:
+            return fpl.pl.DataFrame()
+        if raw_data:
+            return fpl.pl.concat(
+                [fpl.pl.from_pandas(v).insert_column(0, fpl.pl.lit(k).alias('Site'))
+                 for k, v in d.items()],
+                how='diagonal_relaxed',
+            )
+        with _stage('join'):
+            return fpl.ts_merge([fpl.from_pandas(v) for v in d.values()]).pipe(
+                fpl.na_ts_insert)
+    if backend == 'store':
+        import _tools.fun_store as fst
+        with _stage('join'):
+            r = fst.SiteSeriesStore.from_frames(d.values())
+    elif not d:
+        r = pd.DataFrame()
+    elif raw_data:
+        for k, v in d.items():
+            v.insert(0, 'Site', k)
+        r = pd.concat(d.values(), axis=0, join='outer', ignore_index=True)
+    else:
+        with _stage('join'):
+            r = ts_merge(list(d.values())).pipe(na_ts_insert)
+    r.attrs['failed'] = {site: f'{type(e).__name__}: {e}' for site, e in err.items()}
+    return r
 
 
 def hourly_WU_AQ(
@@ -467,7 +1897,11 @@ def hourly_WU_AQ(
         date_start: int = None,
         date_end: int = None,
         raw_data: bool = False,
-    ) -> pd.DataFrame:
+        max_workers: int = 1,
+        client: AquariusClient = None,
+        backend: str = 'pandas',
+        **kwargs
+    ) -> 'pd.DataFrame | pl.DataFrame | SiteSeriesStore':
     """
     A wrapper of getting hourly rate for multiple water meters (from Aquarius)
 
@@ -483,22 +1917,31 @@ def hourly_WU_AQ(
         Otherwise, request the data till its end.
     raw_data : bool, optional, default=False
         Raw data (hourly volume in m^3) from Aquarius (extra info). Default is `False`
+    max_workers : int, optional, default=1
+        The number of sites downloaded concurrently (threads). Default is one at a time.
+        See `set_rate_limit` for capping the requests per second sent to Aquarius.
+    client : AquariusClient, optional, default=None
+        The session shared by all the requests. `default_client()` is used when `None`.
+    backend : str, optional, default='pandas'
+        'pandas', or 'polars' for a pl.DataFrame assembled by `_tools/fun_pl.py`
+        (the failed sites are only printed then, as it has no `.attrs`), or 'store' for
+        a `SiteSeriesStore` (`_tools/fun_store.py`) never padding the sites into a wide
+        frame.
+    **kwargs
+        Passed to `get_ts_AQ`, such as `cache_dir`, `revise_days` and `agg` (e.g.
+        'monthly_sum', then the rates are of the values resampled on the client).
 
     Returns
     -------
-    pd.DataFrame
-        A DataFrame of hourly abstraction
+    pd.DataFrame | pl.DataFrame | SiteSeriesStore
+        A DataFrame of hourly abstraction.
+        Sites failed to download are left out and reported in `.attrs['failed']`.
     """
-    if isinstance(site_list, str):
-        site_list = [site_list]
-    site_list = list(dict.fromkeys(site_list))
-    if raw_data:
-        d = {site: _HWU_AQ(site, date_start, date_end, True) for site in site_list}
-        for k, v in d.items():
-            v.insert(0, 'Site', k)
-        return pd.concat(d.values(), axis=0, join='outer', ignore_index=True)
-    lst = [_HWU_AQ(site, date_start, date_end, False) for site in site_list]
-    return reduce(lambda a, b: a.join(b, how='outer'), lst).pipe(na_ts_insert)
+    return _WU_AQ(
+        _HWU_AQ, 'Flow.WMHourlyMean',
+        site_list, date_start, date_end, raw_data, max_workers, client, backend,
+        **kwargs,
+    )
 
 
 def daily_WU_AQ(
@@ -506,7 +1949,11 @@ def daily_WU_AQ(
         date_start: int = None,
         date_end: int = None,
         raw_data: bool = False,
-    ) -> pd.DataFrame:
+        max_workers: int = 1,
+        client: AquariusClient = None,
+        backend: str = 'pandas',
+        **kwargs
+    ) -> 'pd.DataFrame | pl.DataFrame | SiteSeriesStore':
     """
     A wrapper of getting daily rate for multiple water meters (from Aquarius)
 
@@ -522,19 +1969,212 @@ def daily_WU_AQ(
         Otherwise, request the data till its end.
     raw_data : bool, optional, default=False
         Raw data (daily volume in m^3) from Aquarius (extra info). Default is `False`
+    max_workers : int, optional, default=1
+        The number of sites downloaded concurrently (threads). Default is one at a time.
+        See `set_rate_limit` for capping the requests per second sent to Aquarius.
+    client : AquariusClient, optional, default=None
+        The session shared by all the requests. `default_client()` is used when `None`.
+    backend : str, optional, default='pandas'
+        'pandas', or 'polars' for a pl.DataFrame assembled by `_tools/fun_pl.py`
+        (the failed sites are only printed then, as it has no `.attrs`), or 'store' for
+        a `SiteSeriesStore` (`_tools/fun_store.py`) never padding the sites into a wide
+        frame.
+    **kwargs
+        Passed to `get_ts_AQ`, such as `cache_dir`, `revise_days` and `agg` (e.g.
+        'monthly_sum', then the rates are of the values resampled on the client).
 
     Returns
     -------
-    pd.DataFrame
-        A DataFrame of daily abstraction
+    pd.DataFrame | pl.DataFrame | SiteSeriesStore
+        A DataFrame of daily abstraction.
+        Sites failed to download are left out and reported in `.attrs['failed']`.
     """
+    return _WU_AQ(
+        _DWU_AQ, 'Abstraction Volume.WMDaily',
+        site_list, date_start, date_end, raw_data, max_workers, client, backend,
+        **kwargs,
+    )
+
+
+def _WU_AQ_iter(
+        fun: Callable,
+        measurement: str,
+        site_list: 'str | list[str]',
+        date_start: int = None,
+        date_end: int = None,
+        max_workers: int = 1,
+        client: AquariusClient = None,
+        failed: 'dict | None' = None,
+        **kwargs
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+    """Shared body of `hourly_WU_AQ_iter` and `daily_WU_AQ_iter`"""
     if isinstance(site_list, str):
         site_list = [site_list]
     site_list = list(dict.fromkeys(site_list))
-    if raw_data:
-        d = {site: _DWU_AQ(site, date_start, date_end, True) for site in site_list}
-        for k, v in d.items():
-            v.insert(0, 'Site', k)
-        return pd.concat(d.values(), axis=0, join='outer', ignore_index=True)
-    lst = [_DWU_AQ(site, date_start, date_end, False) for site in site_list]
-    return reduce(lambda a, b: a.join(b, how='outer'), lst).pipe(na_ts_insert)
+    # The ranges of the time series are needed for `chunk` (see `get_ts_AQ`)
+    with_range = kwargs.get('chunk') is not None and date_start is None
+    try:
+        with _stage('uid'):
+            resolve_uids(measurement, site_list, client, with_range)
+    except Exception as e:
+        print(cp(f'Bulk UniqueId lookup failed ({e}) -> resolved site by site!\n', fg=34))
+    yield from _iter_sites(
+        fun, site_list, max_workers, failed,
+        date_start=date_start, date_end=date_end, client=client, **kwargs,
+    )
+
+
+def hourly_WU_AQ_iter(
+        site_list: 'str | list[str]',
+        date_start: int = None,
+        date_end: int = None,
+        max_workers: int = 1,
+        client: AquariusClient = None,
+        failed: 'dict | None' = None,
+        **kwargs
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+    """
+    The streaming version of `hourly_WU_AQ`: yield `(site, hourly rate)` of each water
+    meter as soon as it is downloaded (in the order of completion)
+
+    Only the sites in flight (at most `max_workers`) and the one being consumed are in
+    memory, however many sites are requested. Pass the generator to a sink, such as
+    `sites_to_parquet` or `_tools/fun_duckdb.ingest_sites`, or loop over it, e.g.:
+        > for site, df in hourly_WU_AQ_iter(site_list, max_workers=8): ...
+
+    Parameters
+    ----------
+    site_list, date_start, date_end, max_workers, client
+        See `hourly_WU_AQ`.
+    failed : dict | None, optional, default=None
+        A dict collecting {site: error} of the sites failed to download (which are also
+        printed, and skipped).
+    **kwargs
+        Passed to `get_ts_AQ`, such as `cache_dir`, `revise_days` and `agg`.
+
+    Yields
+    ------
+    tuple[str, pd.DataFrame]
+        The site, and its NaN-padded hourly rate (a single column named by the site).
+    """
+    yield from _WU_AQ_iter(
+        _HWU_AQ, 'Flow.WMHourlyMean',
+        site_list, date_start, date_end, max_workers, client, failed,
+        **kwargs,
+    )
+
+
+def daily_WU_AQ_iter(
+        site_list: 'str | list[str]',
+        date_start: int = None,
+        date_end: int = None,
+        max_workers: int = 1,
+        client: AquariusClient = None,
+        failed: 'dict | None' = None,
+        **kwargs
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+    """
+    The streaming version of `daily_WU_AQ` - see `hourly_WU_AQ_iter`
+
+    Yields
+    ------
+    tuple[str, pd.DataFrame]
+        The site, and its NaN-padded daily rate (a single column named by the site).
+    """
+    yield from _WU_AQ_iter(
+        _DWU_AQ, 'Abstraction Volume.WMDaily',
+        site_list, date_start, date_end, max_workers, client, failed,
+        **kwargs,
+    )
+
+
+def _site_long(site: str, df: pd.DataFrame) -> pd.DataFrame:
+    """A site's frame (of `*_WU_AQ_iter`) -> the long format [TimeStamp, Value, Site]"""
+    s = df.iloc[:, 0]
+    s = s[s.notna()]
+    return pd.DataFrame({
+        'TimeStamp': s.index.to_numpy(),
+        'Value': s.to_numpy(dtype=float),
+        'Site': np.full(s.size, site, dtype=object),
+    })
+
+
+def sites_to_parquet(
+        frames: Iterable[tuple[str, pd.DataFrame]],
+        path: 'str | Path',
+        row_group_size: int = 1 << 17,
+    ) -> int:
+    """
+    Write `(site, frame)` (such as from `hourly_WU_AQ_iter`) to a Parquet file as they
+    come, so a site at a time is in memory
+
+    Parameters
+    ----------
+    frames : Iterable[tuple[str, pd.DataFrame]]
+        The sites and their single-column frames.
+    path : str | Path
+        The Parquet file of columns [TimeStamp, Value, Site] (without the missing values).
+    row_group_size : int, optional, default=1 << 17
+        The maximum number of rows in a row group.
+
+    Returns
+    -------
+    int
+        The number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([
+        ('TimeStamp', pa.timestamp('ns')), ('Value', pa.float64()), ('Site', pa.string()),
+    ])
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for site, df in frames:
+            tbl = pa.Table.from_pandas(_site_long(site, df), schema, preserve_index=False)
+            writer.write_table(tbl, row_group_size=row_group_size)
+            n += tbl.num_rows
+    return n
+
+
+def read_csv_AQ(csv_path: 'str | Path') -> pd.DataFrame:
+    """
+    Read a CSV file saved by ReportRunner (see '_tools/Get-TimeSeries.psm1') in one pass
+
+    Parameters
+    ----------
+    csv_path : str | Path
+        The CSV file, whose 12th line is the header ['TimeStamp', '{Parameter}@{Location}'],
+        and whose 8th line starts with '# {UniqueId (hyphenated)} {Label}...'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The non-missing values in columns
+        ['TimeStamp', 'Value', 'ts_id', 'Parameter', 'Label', 'Location', 'uid', 'CSV'],
+        with 'TimeStamp' parsed as datetime64.
+    """
+    csv_path = Path(csv_path)
+    with csv_path.open(encoding='utf-8') as fi:
+        head = [fi.readline() for _ in range(11)]
+        tmp = pd.read_csv(fi)
+    tmp['TimeStamp'] = pd.to_datetime(tmp['TimeStamp'], format='%Y-%m-%d %H:%M:%S')
+    *param_part, plate = tmp.columns[-1].split('@')
+    param = '@'.join(param_part)
+    uid_hyphen, lab = (
+        next(csv.reader([head[7]]))[0]
+        .split(': ')[0]
+        .replace('# ', '')
+        .replace(f'@{plate}', '')
+        .replace(f'{param}.', '')
+        .split(' ', maxsplit=1)
+    )
+    # To make some column names the same as those from 'aquarius.orc.govt.nz/AQUARIUS'
+    return tmp.rename(columns={tmp.columns[-1]: 'Value'}).dropna().assign(
+        ts_id=f'{param}.{lab}@{plate}',
+        Parameter=param,
+        Label=lab,
+        Location=plate,
+        uid=uid_hyphen.replace('-', ''),
+        CSV=csv_path.name,
+    )
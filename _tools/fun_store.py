@@ -0,0 +1,482 @@
+"""
+A compact, columnar store of the time series of many sites on a shared regular time axis
+
+Instead of a dense wide frame (padded with NaN wherever a site has not started or has
+stopped), each site keeps a contiguous float32/float64 array from its first to its last
+available value, plus its offset (in steps) on the time axis `origin + k * step` shared by
+all the sites. The wide frame is only materialised on demand, e.g.:
+    > import _tools.fun_store as fst
+    > st = fst.SiteSeriesStore.from_frame(hourly_WU_AQ(site_list), dtype='float32')
+    > st['WM0001']        # A zero-copy pd.Series of a site
+    > st.to_frame(start='2020-07-01', end='2021-06-30 23:00')
+
+A store is saved as an archive (a '.npy' file per site + 'index.json' of the time axis,
+and the offset, length and count of the values of each site), which is opened instantly
+and memory-mapped site by site on first access:
+    > st.save('out/archive/hourly')
+    > st = fst.SiteSeriesStore.open('out/archive/hourly')
+    > st.info()                             # From the index only
+    > st['WM0001'].loc['2021']              # Reads the pages of 2021 only
+    > st.hourly_2_daily(9, prop=.8)         # A site at a time
+"""
+import json
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+from urllib import parse
+
+import numpy as np
+import pandas as pd
+
+import _tools.fun_s as fpd
+
+
+# The aggregations of the days (rows of 24 hours, with their counts of values `n`)
+_agg_np = {
+    'mean': lambda v, n: np.nansum(v, axis=1) / n,
+    'sum': lambda v, n: np.nansum(v, axis=1),
+    'min': lambda v, n: np.fmin.reduce(v, axis=1),
+    'max': lambda v, n: np.fmax.reduce(v, axis=1),
+    'count': lambda v, n: n.astype(float),
+}
+
+
+def _trim(v: np.ndarray) -> tuple[int, int]:
+    """The [first, last + 1) range of the non-NaN values of `v` ((0, 0) if none)"""
+    ok = np.flatnonzero(~np.isnan(v))
+    return (int(ok[0]), int(ok[-1]) + 1) if ok.size else (0, 0)
+
+
+class SiteSeriesStore:
+    """
+    Time series of many sites, each a contiguous array on a shared regular time axis
+
+    Parameters
+    ----------
+    step : int
+        The time step (in seconds) of the shared axis.
+    origin : str | pd.Timestamp | np.datetime64
+        The time of the step 0 of the axis. The sites starting earlier move it backwards.
+    dtype : str | np.dtype, optional, default='float64'
+        'float64', or 'float32' for half of the memory (about 7 significant digits).
+    name : str, optional, default='Time'
+        The name of the time/date index (such as 'Date' for the daily rates).
+
+    Notes
+    -----
+        The arrays are read-only views of the stored data, so neither `values(site)` nor
+        `store[site]` copies anything. Only the NaN between the first and the last value
+        of a site are kept, so sparse networks (meters starting and stopping in different
+        years) take a fraction of the memory of the wide frame.
+    """
+
+    def __init__(
+            self,
+            step: int,
+            origin: 'str | pd.Timestamp | np.datetime64',
+            dtype: 'str | np.dtype' = 'float64',
+            name: str = 'Time',
+        ) -> None:
+        if not isinstance(step, (int, np.integer)) or step < 1:
+            raise ValueError(
+                fpd.cp('`step` must be a positive integer (seconds)!\n', fg=35))
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(fpd.cp("`dtype` must be 'float32' or 'float64'!\n", fg=35))
+        self.step = int(step)
+        self.origin = pd.Timestamp(origin).as_unit('ns')
+        self.name = name
+        # The offset (steps on the axis), length and count (of the non-NaN) of the sites
+        self._offset: dict[str, int] = {}
+        self._length: dict[str, int] = {}
+        self._count: dict[str, int] = {}
+        # The loaded arrays, and the files of the ones not loaded yet from the archive
+        self._values: dict[str, np.ndarray] = {}
+        self._path: 'Path | None' = None
+        self._file: dict[str, str] = {}
+        # As `pd.DataFrame.attrs`, e.g. the failed sites of `fpd.hourly_WU_AQ`
+        self.attrs: dict = {}
+
+    # --- Construction ---
+    @classmethod
+    def from_frame(
+            cls,
+            ts: 'pd.DataFrame | pd.Series',
+            dtype: 'str | np.dtype' = 'float64',
+        ) -> 'SiteSeriesStore':
+        """
+        A store of the columns (sites) of a regular, Timestamp-indexed frame
+
+        Parameters
+        ----------
+        ts : pd.DataFrame | pd.Series
+            Such as the wide frames of `fpd.hourly_WU_AQ`/`fpd.daily_WU_AQ`.
+        dtype : str | np.dtype, optional, default='float64'
+
+        Returns
+        -------
+        SiteSeriesStore
+        """
+        return cls.from_frames([ts], dtype)
+
+    @classmethod
+    def from_frames(
+            cls,
+            ts_list: 'Iterable[pd.DataFrame | pd.Series]',
+            dtype: 'str | np.dtype' = 'float64',
+        ) -> 'SiteSeriesStore':
+        """
+        A store of the sites of a list of regular, Timestamp-indexed frames
+
+        Parameters
+        ----------
+        ts_list : Iterable[pd.DataFrame | pd.Series]
+            Such as the frames of the sites (one each) before they are joined into a wide
+            frame. Their steps may differ, and so may their gaps, as long as the times
+            of all of them are on a regular axis (of a step of at least 60 seconds).
+        dtype : str | np.dtype, optional, default='float64'
+
+        Raises
+        ------
+        ValueError
+            When the times of the frames are not on a regular axis.
+
+        Returns
+        -------
+        SiteSeriesStore
+        """
+        lst = [pd.DataFrame(i) for i in ts_list]
+        lst = [i.pipe(fpd.ts_validate) for i in lst if i.shape[1] > 0]
+        # The step of the shared axis: the GCD of the intervals of all the frames
+        step_ns = 0
+        for i in lst:
+            d = np.diff(pd.DatetimeIndex(i.index).as_unit('ns').asi8)
+            step_ns = np.gcd(step_ns, np.gcd.reduce(d)) if d.size else step_ns
+        # A single point (no interval) fits any axis
+        step, rem = divmod(int(step_ns), 10**9) if step_ns else (3600, 0)
+        if rem or step < 60:
+            raise ValueError(fpd.cp('Irregular time series cannot be stored!\n', fg=35))
+        origin = min((i.index[0] for i in lst if i.shape[0]), default=pd.Timestamp(0))
+        name = next((i.index.name for i in lst if i.index.name is not None), 'Time')
+        st = cls(step, origin, dtype, name)
+        for i in lst:
+            for c in i.columns:
+                st.add(c, i[c])
+        return st
+
+    def add(self, site: str, ts: pd.Series) -> None:
+        """
+        Add (or replace) a site by a Timestamp-indexed Series on the time axis
+
+        The values from the first to the last available one are copied (in the dtype of
+        the store), so the store holds no reference to `ts`.
+        """
+        if (err_str := fpd._ts_valid_pd(ts)) is not None:
+            raise TypeError(fpd.cp(err_str, fg=35))
+        v = ts.to_numpy(dtype=self.dtype)
+        a, b = _trim(v)
+        self._file.pop(site, None)
+        if a == b:
+            self._set(site, 0, np.empty(0, dtype=self.dtype))
+            return
+        t = ts.index[a:b].as_unit('ns').asi8
+        k, rem = divmod(t - self.origin.value, self.step * 10**9)
+        if rem.any():
+            raise ValueError(
+                fpd.cp(f'[{site}] is off the time axis of the store!\n', fg=35))
+        k0 = int(k[0])
+        if k[-1] - k0 + 1 == b - a:
+            w = v[a:b].copy()
+        else:
+            # Gaps, or a step coarser than the axis
+            w = np.full(int(k[-1]) - k0 + 1, np.nan, dtype=self.dtype)
+            w[k - k0] = v[a:b]
+        if k0 < 0:
+            # Move the origin back to the start of the site
+            self.origin += pd.Timedelta(seconds=k0 * self.step)
+            self._offset = {i: j - k0 for i, j in self._offset.items()}
+            k0 = 0
+        self._set(site, k0, w)
+
+    def _set(self, site: str, offset: int, w: np.ndarray) -> None:
+        w.flags.writeable = False
+        self._offset[site], self._length[site] = offset, w.size
+        self._count[site] = int(np.count_nonzero(~np.isnan(w)))
+        self._values[site] = w
+
+    # --- Access ---
+    @property
+    def sites(self) -> list[str]:
+        return list(self._offset)
+
+    def __len__(self) -> int:
+        return len(self._offset)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offset)
+
+    def __contains__(self, site: str) -> bool:
+        return site in self._offset
+
+    def __repr__(self) -> str:
+        return (
+            f'<SiteSeriesStore: {len(self)} sites, step={self.step}s, '
+            f'{self.dtype.name}, {self.nbytes / 2**20:.1f} MB>'
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """The memory (or disk space of an archive) taken by the values (bytes)"""
+        return sum(self._length.values()) * self.dtype.itemsize
+
+    def _time(self, k: 'int | np.ndarray') -> 'pd.Timestamp | pd.DatetimeIndex':
+        """The time of the step(s) `k` of the axis"""
+        if np.isscalar(k):
+            return self.origin + pd.Timedelta(seconds=int(k) * self.step)
+        return pd.DatetimeIndex(
+            self.origin.value + np.asarray(k, dtype=np.int64) * (self.step * 10**9),
+            dtype='datetime64[ns]',
+            name=self.name,
+        )
+
+    def _step_of(self, t: 'str | pd.Timestamp', side: str) -> int:
+        """The step of the axis at/after ('left') or at/before ('right') a time"""
+        ns = pd.Timestamp(t).as_unit('ns').value - self.origin.value
+        q = self.step * 10**9
+        return -(-ns // q) if side == 'left' else ns // q
+
+    def values(self, site: str) -> np.ndarray:
+        """The (read-only) values of a site, from its first to its last available value"""
+        if (v := self._values.get(site)) is None:
+            # Memory-mapped on the first access (an empty array cannot be mapped)
+            v = np.load(
+                self._path / self._file[site], mmap_mode='r' if self._length[site] else None
+            )
+            self._values[site] = v
+        return v
+
+    def span(self, site: str) -> tuple[int, int]:
+        """The [start, end) steps of a site on the time axis"""
+        k0 = self._offset[site]
+        return k0, k0 + self._length[site]
+
+    def index(self, site: str) -> pd.DatetimeIndex:
+        """The time of the values of a site"""
+        return self._time(np.arange(*self.span(site)))
+
+    def __getitem__(self, site: str) -> pd.Series:
+        """A site as a Timestamp-indexed pd.Series sharing the memory of the store"""
+        s = pd.Series(self.values(site), index=self.index(site), name=site, copy=False)
+        fpd._mark_index_valid(s.index)
+        return s
+
+    def astype(self, dtype: 'str | np.dtype') -> 'SiteSeriesStore':
+        """A copy of the store in another dtype ('float32' or 'float64')"""
+        st = SiteSeriesStore(self.step, self.origin, dtype, self.name)
+        for site in self:
+            st._set(site, self._offset[site], self.values(site).astype(st.dtype))
+        st.attrs = dict(self.attrs)
+        return st
+
+    # --- Archive ---
+    def save(self, path: 'str | Path') -> Path:
+        """
+        Save the store as an archive, to be opened (memory-mapped) by `SiteSeriesStore.open`
+
+        Parameters
+        ----------
+        path : str | Path
+            The folder of the archive, such as 'out/archive/hourly'.
+            The '.npy' files of the sites dropped since the last save are removed.
+
+        Returns
+        -------
+        Path
+            The 'index.json' of the archive.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        fi_index = path / 'index.json'
+        f_old = set()
+        if fi_index.exists():
+            f_old = {i['file'] for i in json.loads(fi_index.read_text())['sites'].values()}
+        same = self._path is not None and self._path.resolve() == path.resolve()
+        sites = {}
+        for site in self:
+            f = self._file.get(site) if same else None
+            if f is None:
+                # The site names are kept in the file names (quoted to be valid)
+                f = f"{parse.quote(site, safe='')}.npy"
+                np.save(path / f, self.values(site))
+            sites[site] = {
+                'file': f,
+                'start': self._time(self._offset[site]).isoformat(),
+                'offset': self._offset[site],
+                'length': self._length[site],
+                'count': self._count[site],
+            }
+        tmp = fi_index.with_suffix('.tmp')
+        tmp.write_text(json.dumps({
+            'step': self.step,
+            'origin': self.origin.isoformat(),
+            'dtype': self.dtype.name,
+            'name': self.name,
+            'sites': sites,
+        }, indent=1))
+        tmp.replace(fi_index)
+        for f in f_old - {i['file'] for i in sites.values()}:
+            (path / f).unlink(missing_ok=True)
+        return fi_index
+
+    @classmethod
+    def open(cls, path: 'str | Path') -> 'SiteSeriesStore':
+        """
+        Open an archive saved by `SiteSeriesStore.save`
+
+        Only 'index.json' is read, so it takes no time regardless of the size of the
+        archive. The file of a site is memory-mapped (read-only) when its values are first
+        needed, and only the pages used are read from the disk.
+
+        Parameters
+        ----------
+        path : str | Path
+            The folder of the archive.
+
+        Returns
+        -------
+        SiteSeriesStore
+        """
+        path = Path(path)
+        d = json.loads((path / 'index.json').read_text())
+        st = cls(d['step'], d['origin'], d['dtype'], d['name'])
+        st._path = path
+        for site, i in d['sites'].items():
+            st._offset[site], st._length[site] = i['offset'], i['length']
+            st._count[site], st._file[site] = i['count'], i['file']
+        return st
+
+    # --- Materialisation ---
+    def to_frame(
+            self,
+            sites: 'list[str] | None' = None,
+            start: 'str | pd.Timestamp | None' = None,
+            end: 'str | pd.Timestamp | None' = None,
+        ) -> pd.DataFrame:
+        """
+        Materialise the wide frame (the same as `fpd.hourly_WU_AQ`/`fpd.daily_WU_AQ`)
+
+        Parameters
+        ----------
+        sites : list[str] | None, optional, default=None
+            The columns of the frame. All the sites when `None`.
+        start, end : str | pd.Timestamp | None, optional, default=None
+            The time range (both inclusive, as timestamps, e.g. '2021-06-30 23:00' rather
+            than the whole day '2021-06-30' of `.loc`). The frame runs from the first to
+            the last available value of the sites when `None`.
+
+        Returns
+        -------
+        pd.DataFrame
+            NaN-padded on the regular time axis, of the dtype of the store.
+        """
+        sites = self.sites if sites is None else list(sites)
+        spans = [self.span(i) for i in sites]
+        ok = [a for a, b in spans if b > a]
+        k0 = min(ok, default=0) if start is None else self._step_of(start, 'left')
+        k1 = (
+            max((b for a, b in spans if b > a), default=0) if end is None
+            else self._step_of(end, 'right') + 1
+        )
+        k1 = max(k1, k0)
+        v = np.full((k1 - k0, len(sites)), np.nan, dtype=self.dtype)
+        for j, (site, (a, b)) in enumerate(zip(sites, spans)):
+            i0, i1 = max(a, k0), min(b, k1)
+            if i1 > i0:
+                v[i0 - k0:i1 - k0, j] = self.values(site)[i0 - a:i1 - a]
+        r = pd.DataFrame(v, index=self._time(np.arange(k0, k1)), columns=pd.Index(sites))
+        fpd._mark_index_valid(r.index)
+        return r
+
+    def info(self) -> pd.DataFrame:
+        """
+        The data availability of the sites - the same as `fpd.ts_info(self.to_frame())`,
+        without materialising the wide frame
+
+        Returns
+        -------
+        pd.DataFrame
+            Info on ['Site', 'Start', 'End', 'Length_yr', 'Completion_%'].
+        """
+        n = np.array([self._count[i] for i in self], dtype=np.int64)
+        spans = np.array([self.span(i) for i in self], dtype=np.int64).reshape(-1, 2)
+        has = n > 0
+        info = pd.DataFrame({
+            'Site': pd.Index(self.sites, dtype=str),
+            'Start': pd.Series(self._time(spans[:, 0])).where(has),
+            'End': pd.Series(self._time(spans[:, 1] - 1)).where(has),
+            'n': pd.Series(n).where(has),
+        })
+        d_yr = 365.2422
+        step_day = self.step / (3600 * 24)
+        length_yr = (info['End'] - info['Start']) / pd.Timedelta(f'{d_yr}D')
+        info['Length_yr'] = length_yr + step_day / d_yr
+        info['Completion_%'] = info['n'] * step_day / (length_yr * d_yr + step_day) * 100
+        return info.drop(columns='n')
+
+    def hourly_2_daily(
+            self,
+            day_starts_at: int = 0,
+            agg: 'Callable | str' = 'mean',
+            prop: float = 1.,
+            sites: 'list[str] | None' = None,
+        ) -> 'SiteSeriesStore':
+        """
+        `fpd.hourly_2_daily` site by site, so a single site is in memory at a time (such
+        as straight from a memory-mapped archive)
+
+        For an hourly store, 'mean', 'sum', 'min', 'max' and 'count' (or the respective
+        functions) reduce the values of a site reshaped into the rows of 24 hours.
+
+        Parameters
+        ----------
+        day_starts_at, agg, prop
+            See `fpd.hourly_2_daily`.
+        sites : list[str] | None, optional, default=None
+            All the sites when `None`.
+
+        Returns
+        -------
+        SiteSeriesStore
+            The daily time series ('Date'), whose `to_frame()` is the same as
+            `fpd.hourly_2_daily(self.to_frame(sites), day_starts_at, agg, prop)`.
+        """
+        if not isinstance(day_starts_at, int) or day_starts_at < 0 or day_starts_at > 23:
+            raise ValueError('`day_starts_at` must be an integer in [0, 23]!\n')
+        if prop < 0 or prop > 1:
+            raise ValueError('`prop` must be in [0, 1]!\n')
+        fun = agg if isinstance(agg, str) else fpd._agg_name(agg)
+        fast = self.step == 3600 and fun in _agg_np
+        # Hourly values are labelled by the end of the hours
+        shift = (1 + day_starts_at) * 3600 * 10**9
+        day_ns, hour_ns = 86400 * 10**9, 3600 * 10**9
+        st = SiteSeriesStore(86400, self.origin.normalize(), self.dtype, 'Date')
+        for site in self.sites if sites is None else sites:
+            s = self[site]
+            if s.size and not fast:
+                s = fpd.hourly_2_daily(s.to_frame(), day_starts_at, agg, prop).iloc[:, 0]
+            elif s.size:
+                t0 = self.origin.value + self._offset[site] * hour_ns - shift
+                day0, lead = divmod(t0, day_ns)
+                lead //= hour_ns
+                n_day = -(-(lead + s.size) // 24)
+                v = np.full(n_day * 24, np.nan)
+                v[lead:lead + s.size] = s.to_numpy()
+                v = v.reshape(n_day, 24)
+                n = (~np.isnan(v)).sum(axis=1)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    r = _agg_np[fun](v, n)
+                s = pd.Series(
+                    np.where((n > 0) & (n / 24 >= prop), r, np.nan),
+                    index=pd.DatetimeIndex((day0 + np.arange(n_day)) * day_ns),
+                )
+            st.add(site, s)
+        return st
@@ -35,6 +35,15 @@ param_list = json.loads(r_param.data.decode('utf-8')).get('Parameters')
 param_dict = {i.get('Identifier'): i.get('UnitIdentifier') for i in param_list}
 
 
+# ===========================================================================
+# --- 'GetTimeSeriesDescriptionList': Identifier <-> UniqueId (uid index) ---
+# ===========================================================================
+url_ts = f'{end_point}/GetTimeSeriesDescriptionList'
+r_ts = http.request('GET', url_ts, headers=hdr)
+ts_list = json.loads(r_ts.data.decode('utf-8')).get('TimeSeriesDescriptions')
+uid_dict = {i.get('Identifier'): i.get('UniqueId') for i in ts_list}
+
+
 # ===================================
 # --- Export the obtained information
 # ===================================
@@ -47,9 +56,11 @@ if not (path_info := Path('info')).exists():
 with (
     Path(path_info / 'plate_info.json').open('w') as w1,
     Path(path_info / 'param_info.json').open('w') as w2,
+    Path(path_info / 'uid_info.json').open('w') as w3,
 ):
     json.dump(plate_dict, w1, indent=4)
     json.dump(param_dict, w2, indent=4)
+    json.dump(uid_dict, w3, indent=4)
 
 
 print(f'\nTime elapsed:\t{(time.perf_counter() - time_start):.3f} seconds.')
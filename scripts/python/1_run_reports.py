@@ -0,0 +1,43 @@
+"""
+Download the time series (by UniqueId) through a report template, as `Get-TimeSeries` in
+the PowerShell scripts (see 'scripts/dryness_report.ps1') but concurrently, e.g.:
+    > python scripts/python/1_run_reports.py report_setting/daily_mean.json out/csv/dFlo ^
+        30e1327c88364c6dbcc5028212663a82 f274e82671fa4f2f8b996c4e75dca5e1
+    > python scripts/python/1_run_reports.py report_setting/daily_sum.json out/csv/dRain ^
+        --uid-file rain_uids.txt --max-workers 8
+"""
+import argparse
+import time
+from pathlib import Path
+
+import _tools.fun_report as frp
+import _tools.fun_s as fpd
+
+time_start = time.perf_counter()
+
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument('json', help="The report template, e.g. 'report_setting/daily_mean.json'")
+parser.add_argument('out_folder', help="The folder of the CSV files, e.g. 'out/csv/dFlo'")
+parser.add_argument('uid', nargs='*', help='The UniqueIds of the time series')
+parser.add_argument('--uid-file', help='A text file of UniqueIds (one per line)')
+parser.add_argument('--max-workers', type=int, default=4, help='Concurrent downloads')
+parser.add_argument('--end-point', default=None, help="AQ's Publish v2 end point")
+args = parser.parse_args()
+
+uid_list = args.uid + (
+    Path(args.uid_file).read_text().split() if args.uid_file is not None else []
+)
+client = fpd.AquariusClient(
+    **({} if args.end_point is None else {'end_point': args.end_point})
+)
+with client:
+    r = frp.run_reports(uid_list, args.json, args.out_folder, args.max_workers, client)
+print(
+    f'\n{len(r)}/{len(uid_list)} time series saved in '
+    + fpd.cp(f'<{args.out_folder}>', fg=33)
+)
+
+
+# Print out something showing it runs properly
+print(fpd.cp(f'Time elapsed:\t{(time.perf_counter() - time_start):.3f} seconds.', fg=34))
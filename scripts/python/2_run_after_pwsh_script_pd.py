@@ -1,9 +1,13 @@
-
+import hashlib
 import json
+import os
+import re
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import pandas as pd
+import _tools.fun_meta as fmt
 import _tools.fun_s as fpd
 
 time_start = time.perf_counter()
@@ -16,6 +20,8 @@ path = Path.cwd()
 path_out = path / 'out'
 path_csv = path_out / 'csv'
 path_info = path / 'info'
+# Hive-partitioned: folder=*/Location=*/year=*/{fragment_key}-{i}.parquet
+path_dataset = path_out / 'parquet'
 
 # Check if folder <out/csv> exists, raise otherwise
 if not path_csv.exists():
@@ -24,12 +30,10 @@ if not path_csv.exists():
     )
 
 
-# Read the reference flow sites (LocationIdentifier/Site)
-with open(path_info / 'plate_info.json', 'r') as fi:
-    plate_dict = json.load(fi)
-
-# Read the parameters and units
-param_dict = json.loads((path_info / 'param_info.json').read_text())
+# The reference flow sites (LocationIdentifier/Site) and the units of the parameters,
+# indexed for the lookups of whole columns (loaded on first use, cached in <info>)
+plate_info = fmt.plates(path_info)
+param_info = fmt.params(path_info)
 
 
 # Detect the folders in `path_csv` folder
@@ -38,127 +42,234 @@ path_folders = [i for i in path_csv.iterdir() if i.is_dir()]
 csv_files = [i for i in path_csv.rglob('*.csv') if i.is_file()]
 
 
-# For each folder, read the csv data files
-for path_folder in path_folders:
+# The metadata columns (repeated on each row) stored as categorical/dictionary-encoded
+col_meta = ['Unit', 'ts_id', 'Parameter', 'Label', 'Location', 'Site', 'uid', 'CSV']
+col_all = ['TimeStamp', 'Value', *col_meta]
+# The rows per row group of the Parquet files (~15 years of an hourly site)
+row_group_size = 1 << 17
+
+# The CSV files (mtime, size & hash) read in the previous runs
+path_manifest = path_out / 'csv_manifest.json'
+manifest = json.loads(path_manifest.read_text()) if path_manifest.exists() else {}
+
+
+def csv_stamp(csv_path: Path, stamp_old: dict = None) -> dict:
+    """The (mtime, size & sha1) of a CSV file - sha1 only computed if mtime/size changed"""
+    st = csv_path.stat()
+    stamp = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+    if stamp_old and all(stamp_old.get(k) == v for k, v in stamp.items()):
+        return stamp_old
+    return stamp | {'sha1': hashlib.sha1(csv_path.read_bytes()).hexdigest()}
+
+
+def fragment_key(csv_name: str, stamp: dict) -> str:
+    """The prefix of the Parquet files of a CSV file - its name & content hashed"""
+    return f"{hashlib.md5(csv_name.encode()).hexdigest()[:16]}-{stamp['sha1'][:16]}"
+
+
+_re_fragment = re.compile(r'([0-9a-f]{16}-[0-9a-f]{16})-\d+\.parquet')
+
+
+def stale_fragments(path_part: Path, keys: set[str]) -> list[Path]:
+    """
+    The Parquet files in a partition not of `keys`: those of the CSV files changed or
+    removed since written, and those written before the files were split by CSV
+    """
+    return [
+        i for i in path_part.glob('*/*/*.parquet')
+        if (m := _re_fragment.fullmatch(i.name)) is None or m.group(1) not in keys
+    ]
+
+
+def with_meta(ts: pd.DataFrame) -> pd.DataFrame:
+    """The units & site names of the rows added, in the columns of the dataset"""
+    return ts.assign(
+        Unit=param_info.map(ts['Parameter']),
+        Site=plate_info.map(ts['Location']),
+    )[col_all]
+
+
+if __name__ == '__main__':
+
+    # Check which CSV files are new/changed in each folder
+    # (Windows caps a process pool at 61 workers)
+    pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 61))
+    jobs = {}
+    for path_folder in path_folders:
+        csv_paths = [i for i in path_folder.iterdir() if i.is_file()]
+        stamps = {
+            i.name: csv_stamp(i, manifest.get(f'{path_folder.name}/{i.name}'))
+            for i in csv_paths
+        }
+        keys = {fragment_key(k, v) for k, v in stamps.items()}
+        path_part = path_dataset / f'folder={path_folder.stem}'
+        # The files of the CSV files of the same content are kept, unless the partition
+        # was written before the files were split by CSV (read all of them again)
+        split = path_part.exists() and all(
+            _re_fragment.fullmatch(i.name) for i in path_part.glob('*/*/*.parquet'))
+        kept = {
+            k for k, v in stamps.items()
+            if split
+            and v.get('sha1') == manifest.get(f'{path_folder.name}/{k}', {}).get('sha1')
+        }
+        jobs[path_folder] = {
+            'csv_paths': csv_paths,
+            'stamps': stamps,
+            'keys': keys,
+            'kept': kept,
+        }
+
+    # For each folder, put the CSV data together
+    for path_folder, job in jobs.items():
+
+        # Get the list of CSV files in full path
+        csv_paths = job['csv_paths']
+        csv_names = [i.name for i in csv_paths]
+        folder_name = path_folder.stem
 
-    # Get the list of CSV files in full path
-    csv_paths = [i for i in path_folder.iterdir() if i.is_file()]
-    csv_names = [i.name for i in csv_paths]
-    folder_name = path_folder.stem
+        # Check if the respective folder having CSV data file(s)
+        manifest = {
+            k: v for k, v in manifest.items() if k.split('/', 1)[0] != path_folder.name
+        }
+        path_part = path_dataset / f'folder={folder_name}'
+        if not csv_names:
+            path_manifest.write_text(json.dumps(manifest, indent=4))
+            print(
+                '\nNo CSV files in folder '
+                + fpd.cp(f'<{path_folder.relative_to(path)}>\n', fg=33)
+            )
+            continue
+
+        # Skip the folder if none of its CSV files has changed since the last run
+        manifest |= {f'{path_folder.name}/{k}': v for k, v in job['stamps'].items()}
+        # Read the new/changed CSV files in parallel - a folder at a time, so that only
+        # the DataFrames of a single folder are held at once
+        futures = {
+            i.name: pool.submit(fpd.read_csv_AQ, i)
+            for i in csv_paths if i.name not in job['kept']
+        }
+        if not futures and not stale_fragments(path_part, job['keys']):
+            path_manifest.write_text(json.dumps(manifest, indent=4))
+            print(
+                '\nThe CSV files in folder '
+                + fpd.cp(f'<{path_folder.relative_to(path)}>', fg=33)
+                + ' unchanged since '
+                + fpd.cp(f'{path_part.relative_to(path)}', fg=36),
+            )
+            continue
 
-    # Check if the respective folder having CSV data file(s)
-    if not csv_names:
+        # Save the data as a partitioned parquet dataset (for data sharing purpose), so
+        # that the readers can prune the partitions (e.g. a single site/year). Each CSV
+        # file is written as the files of its own, so that only the new/changed ones are
+        # written, and only then the files of the changed/removed ones deleted (a failed
+        # run leaves the files to delete, which the next run deletes)
+        n_new = len(futures)
+        for k, fut in futures.items():
+            ts = with_meta(fut.result())
+            ts.astype({i: 'category' for i in col_meta}).assign(
+                folder=folder_name, year=ts['TimeStamp'].dt.year,
+            ).to_parquet(
+                path_dataset,
+                index=False,
+                partition_cols=['folder', 'Location', 'year'],
+                basename_template=f"{fragment_key(k, job['stamps'][k])}-{{i}}.parquet",
+                row_group_size=row_group_size,
+            )
+        del futures
+        path_manifest.write_text(json.dumps(manifest, indent=4))
+        for i in stale_fragments(path_part, job['keys']):
+            i.unlink()
+            for j in (i.parent, i.parent.parent):
+                if not any(j.iterdir()):
+                    j.rmdir()
         print(
-            '\nNo CSV files in folder '
-            + fpd.cp(f'<{path_folder.relative_to(path)}>\n', fg=33)
-        )
-        continue
-
-    # Make the DataFrame for each `folder_name`
-    ts = pd.DataFrame()
-    for csv_path in csv_paths:
-        tmp = pd.read_csv(csv_path, header=11)
-        *param_part, plate = tmp.columns[-1].split('@')
-        param = '@'.join(param_part)
-        uid_hyphen, lab = (
-            pd.read_csv(csv_path, nrows=1, skiprows=6)
-            .iat[0, 0]
-            .split(': ')[0]
-            .replace('# ', '')
-            .replace(f'@{plate}', '')
-            .replace(f'{param}.', '')
-            .split(' ', maxsplit=1)
+            '\nThe CSV files in folder '
+            + fpd.cp(f'<{path_folder.relative_to(path)}>', fg=33)
+            + f' ({n_new} new/changed)'
+            + ' exported as '
+            + fpd.cp(f'{path_part.relative_to(path)}', fg=36),
         )
-        # To make some column names the same as those from 'aquarius.orc.govt.nz/AQUARIUS'
-        tmp = tmp.rename(columns={tmp.columns[-1]: 'Value'}).dropna().assign(
-            Unit=param_dict.get(param),
-            ts_id=f'{param}.{lab}@{plate}',
-            Parameter=param,
-            Label=lab,
-            Location=plate,
-            Site=plate_dict.get(plate),
-            uid=uid_hyphen.replace('-', ''),
-            CSV=f'{csv_path.name}',
+        if not path_part.exists():
+            continue
+
+        # The whole folder read back for the wide Frame (in the order of `csv_names`, as
+        # if all the CSV files were read again)
+        order = {k: i for i, k in enumerate(csv_names)}
+        ts = pd.read_parquet(path_part).drop(columns='year')
+        ts = ts.astype({i: str for i in col_meta if i in ts})
+        ts = with_meta(
+            ts.sort_values('CSV', key=lambda x: x.map(order), kind='stable')
+            .reset_index(drop=True)
         )
-        ts = pd.concat([ts, tmp], axis=0, sort=False, ignore_index=True)
-
-    # Save the data as a parquet (for data sharing purpose) from this folder
-    parquet_2_save = path_out / f'{folder_name}.parquet'
-    ts.to_parquet(parquet_2_save)
-    print(
-        '\nThe CSV files in folder '
-        + fpd.cp(f'<{path_folder.relative_to(path)}>', fg=33)
-        + ' exported as '
-        + fpd.cp(f'{parquet_2_save.relative_to(path)}', fg=36),
-    )
 
-    # To convert the 'tidy' data to the wide Frame:
-    # - Ensure that the Site/Plate is unique (for the wide format conversion)
-    if ts['Location'].unique().size < len(csv_paths):
-        nloc_df = ts[['Location', 'CSV']].drop_duplicates()
-        nloc_df['C'] = nloc_df.groupby('Location').transform(pd.Series.count)
-        loc_dup = nloc_df.query('C > 1')['CSV'].tolist()
-        print(
-            fpd.cp(
-                '\tWide format is ignored due to '
-                f'the duplicated site names from files:\t{sorted(loc_dup)}\n',
-                fg=34,
+        # To convert the 'tidy' data to the wide Frame:
+        # - Ensure that the Site/Plate is unique (for the wide format conversion)
+        if ts['Location'].unique().size < len(csv_paths):
+            nloc_df = ts[['Location', 'CSV']].drop_duplicates()
+            nloc_df['C'] = nloc_df.groupby('Location').transform(pd.Series.count)
+            loc_dup = nloc_df.query('C > 1')['CSV'].tolist()
+            print(
+                fpd.cp(
+                    '\tWide format is ignored due to '
+                    f'the duplicated site names from files:\t{sorted(loc_dup)}\n',
+                    fg=34,
+                )
             )
-        )
-        continue
+            continue
 
-    # - Ensure that 'Unit' and 'Parameter' are uniform (for each folder having the data)
-    if ts[['Unit', 'Parameter']].drop_duplicates().shape[0] > 1:
-        print(
-            fpd.cp(
-                "\tWide format is ignored as data's `Unit` & `Parameter` from "
-                f'<{path_folder.relative_to(path)}> are NOT uniform\n',
-                fg=34,
+        # - Ensure that 'Unit' and 'Parameter' are uniform (for each folder having the data)
+        if ts[['Unit', 'Parameter']].drop_duplicates().shape[0] > 1:
+            print(
+                fpd.cp(
+                    "\tWide format is ignored as data's `Unit` & `Parameter` from "
+                    f'<{path_folder.relative_to(path)}> are NOT uniform\n',
+                    fg=34,
+                )
+            )
+            continue
+
+        # - Ensure the time series having regular time step (<= 1 day)
+        udt = ts['TimeStamp'].unique()
+        udt_df = pd.DataFrame({'VV': 0}, index=sorted(udt))
+        step = fpd.ts_step(udt_df)
+        if step == -1 or step > 86400:
+            print(
+                fpd.cp(
+                    '\tWide format is ignored due to:\n'
+                    '\t\t* either an irregular time step, or\n'
+                    '\t\t* a time step > 1 day\n',
+                    fg=34,
+                )
             )
+            continue
+
+        # When all criteria being met, make a wide Frame
+        name_idx = 'Date' if step == 86400 else 'Time'
+        w = (
+            ts.pivot(columns='Site', values='Value', index='TimeStamp')
+            .loc[:, ts['Site'].unique()]
+            .reset_index()
+        )
+        ts_w = (
+            w.rename(columns={'TimeStamp': name_idx})
+            .sort_values(name_idx)
+            .set_index(name_idx)
+            .pipe(fpd.na_ts_insert)
         )
-        continue
 
-    # - Ensure the time series having regular time step (<= 1 day)
-    udt = pd.to_datetime(ts['TimeStamp'], format='%Y-%m-%d %H:%M:%S').unique()
-    udt_df = pd.DataFrame({'VV': 0}, index=sorted(udt))
-    step = fpd.ts_step(udt_df)
-    if step == -1 or step > 86400:
+        # Save the wide format
+        parquet_2_save_wide = path_out / f'{folder_name}_wide.parquet'
+        ts_w.reset_index().to_parquet(parquet_2_save_wide, row_group_size=row_group_size)
         print(
-            fpd.cp(
-                '\tWide format is ignored due to:\n'
-                '\t\t* either an irregular time step, or\n'
-                '\t\t* a time step > 1 day\n',
-                fg=34,
-            )
+            '\t'
+            + fpd.cp(f'{path_part.relative_to(path)}', fg=36)
+            + ' -> '
+            + fpd.cp(f'{parquet_2_save_wide.relative_to(path)}', fg=35),
+            end='\n\n',
         )
-        continue
-
-    # When all criteria being met, make a wide Frame
-    name_idx = 'Date' if step == 86400 else 'Time'
-    w = (
-        ts.pivot(columns='Site', values='Value', index='TimeStamp')
-        .loc[:, ts['Site'].unique()]
-        .reset_index()
-    )
-    w['TimeStamp'] = pd.to_datetime(w['TimeStamp'], format='%Y-%m-%d %H:%M:%S')
-    ts_w = (
-        w.rename(columns={'TimeStamp': name_idx})
-        .sort_values(name_idx)
-        .set_index(name_idx)
-        .pipe(fpd.na_ts_insert)
-    )
 
-    # Save the wide format
-    parquet_2_save_wide = path_out / f'{folder_name}_wide.parquet'
-    ts_w.reset_index().astype({name_idx: str}).to_parquet(parquet_2_save_wide)
-    print(
-        '\t'
-        + fpd.cp(f'{parquet_2_save.relative_to(path)}', fg=36)
-        + ' -> '
-        + fpd.cp(f'{parquet_2_save_wide.relative_to(path)}', fg=35),
-        end='\n\n',
-    )
+    pool.shutdown()
 
 
-# Print out something showing it runs properly
-print(fpd.cp(f'Time elapsed:\t{(time.perf_counter() - time_start):.3f} seconds.', fg=34))
+    # Print out something showing it runs properly
+    print(fpd.cp(f'Time elapsed:\t{(time.perf_counter() - time_start):.3f} seconds.', fg=34))
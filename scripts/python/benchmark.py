@@ -0,0 +1,786 @@
+"""
+Benchmarks for `_tools/fun_s.py` against a local stub of AQ's Publish v2
+
+Run it from the project folder, e.g.:
+    > python -m scripts.python.benchmark
+    > python -m scripts.python.benchmark connection_reuse pipeline
+    > python -m scripts.python.benchmark pipeline --out out/benchmark/v2.json
+    > python -m scripts.python.benchmark pipeline --compare out/benchmark/v1.json
+
+It exits with 1 if any of the checks (such as 'identical' or 'lazy') in the results is
+false.
+"""
+import argparse
+import datetime
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import reduce
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from urllib import parse
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import urllib3
+
+import _tools.fun_s as fpd
+
+
+# ===========================================================
+# --- A local stub of AQ's Publish v2 (plain HTTP/1.1) ---
+# ===========================================================
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep the connections alive
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.n_connection += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = parse.urlsplit(self.path)
+        query = dict(parse.parse_qsl(url.query))
+        service = url.path.rsplit('/', 1)[-1]
+        with self.server.lock:
+            self.server.n_request += 1
+        if service == 'GetTimeSeriesDescriptionList':
+            sites = (
+                [query['LocationIdentifier']] if 'LocationIdentifier' in query
+                else self.server.sites
+            )
+            body = {'TimeSeriesDescriptions': [
+                self.server.description(query.get('Parameter', 'Flow'), site)
+                for site in sites
+            ]}
+        elif service == 'GetTimeSeriesDescriptionListByUniqueId':
+            body = {'TimeSeriesDescriptions': [
+                self.server.description(*self.server.uids[i])
+                for i in query['TimeSeriesUniqueIds'].split(',') if i in self.server.uids
+            ]}
+        elif service == 'GetTimeSeriesCorrectedData':
+            body = None
+            data = self.server.body_points(
+                query['QueryFrom'], query['QueryTo'], query.get('TimeSeriesUniqueId'))
+        else:
+            self.send_error(404)
+            return
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubAQ(ThreadingHTTPServer):
+    """
+    A local Publish v2 stub counting the TCP connections (handshakes) and requests
+
+    Every time series has `n_point` points, ending at each `step` (seconds) from
+    2020-01-01, of the values `i / 10` (i = 1, ..., n_point). A share `gap` of them is
+    left out (the same ones for a UniqueId), and the midnights are in '24:00:00' of the
+    previous days (as Aquarius does) if `h24`.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+            self,
+            n_site: int = 1000,
+            n_point: int = 24,
+            step: int = 3600,
+            gap: float = 0.,
+            h24: bool = True,
+        ):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.n_point, self.step, self.gap, self.h24 = n_point, step, gap, h24
+        self.sites = [f'WM{i:04d}' for i in range(n_site)]
+        self.uids = {
+            self.description(param, site)['UniqueId']: (param, site)
+            for param in ('Flow', 'Abstraction Volume') for site in self.sites
+        }
+        self.lock = threading.Lock()
+        self.n_connection = self.n_request = 0
+        self.end_point = f'http://127.0.0.1:{self.server_port}/AQUARIUS/Publish/v2'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+    def description(self, param: str, site: str) -> dict:
+        """The time series description of 'GetTimeSeriesDescriptionList'"""
+        ts_id = f"{param}.{'WMDaily' if param == 'Abstraction Volume' else 'WMHourlyMean'}"
+        ts_id = f'{ts_id}@{site}'
+        t = datetime.datetime(2020, 1, 1) + datetime.timedelta(seconds=self.step)
+        t_end = datetime.datetime(2020, 1, 1) + datetime.timedelta(
+            seconds=self.step * self.n_point)
+        return {
+            'Identifier': ts_id,
+            'UniqueId': hashlib.md5(ts_id.encode()).hexdigest(),
+            'Parameter': param,
+            'Label': ts_id.split('@')[0].split('.')[-1],
+            'LocationIdentifier': site,
+            'Unit': 'm^3/s',
+            'UtcOffset': 12.0,
+            'CorrectedStartTime': f'{t:%Y-%m-%dT%H:%M:%S}.0000000+12:00',
+            'CorrectedEndTime': f'{t_end:%Y-%m-%dT%H:%M:%S}.0000000+12:00',
+        }
+
+    def points(
+            self,
+            query_from: str,
+            query_to: str,
+            uid: str = None,
+        ) -> tuple[np.ndarray, np.ndarray]:
+        """The (Timestamp, Value) of the points of a time series in a window"""
+        t0 = np.datetime64('2020-01-01T00:00:00', 's')
+        t_from = np.datetime64(query_from[:19], 's')
+        t_to = np.datetime64(query_to[:19], 's')
+        i0 = max(-(-(t_from - t0).astype(int) // self.step), 1)
+        i1 = min((t_to - t0).astype(int) // self.step, self.n_point)
+        i = np.arange(i0, i1 + 1)
+        if self.gap > 0 and uid is not None:
+            rng = np.random.default_rng(int(uid[:8], 16))
+            i = i[rng.random(self.n_point + 1)[i] >= self.gap]
+        t = t0 + i * np.timedelta64(self.step, 's')
+        ts = np.datetime_as_string(t, unit='s')
+        if self.h24:
+            day = t.astype('datetime64[D]')
+            mid = t == day
+            ts[mid] = np.char.add(
+                np.datetime_as_string(day[mid] - 1, unit='D'), 'T24:00:00')
+        return ts, i / 10
+
+    def body_points(self, query_from: str, query_to: str, uid: str = None) -> bytes:
+        """The body of 'GetTimeSeriesCorrectedData' (as `json.dumps` would write it)"""
+        ts, v = self.points(query_from, query_to, uid)
+        pts = ', '.join(
+            f'{{"Timestamp": "{t}.0000000+12:00", "Value": {{"Numeric": {x!r}}}}}'
+            for t, x in zip(ts.tolist(), v.tolist())
+        )
+        return f'{{"Points": [{pts}]}}'.encode('utf-8')
+
+    def reset(self) -> None:
+        with self.lock:
+            self.n_connection = self.n_request = 0
+
+
+def _serve_stub(conn, **kwargs) -> None:
+    """Run a `StubAQ` (in a child process), sending its end point back through `conn`"""
+    stub = StubAQ(**kwargs)
+    conn.send(stub.end_point)
+    stub.serve_forever()
+
+
+@contextmanager
+def stub_process(**kwargs) -> Iterator[str]:
+    """
+    A `StubAQ(**kwargs)` in a child process -> its end point, so that neither the time
+    nor the memory of the stub is counted in the measurements
+    """
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve_stub, args=(child,), kwargs=kwargs)
+    proc.start()
+    try:
+        yield parent.recv()
+    finally:
+        proc.terminate()
+        proc.join()
+
+
+def _measure(fun, *args, **kwargs) -> tuple[Any, dict]:
+    """Run `fun` -> (its result, {'seconds': elapsed, 'peak_MB': peak memory allocated})"""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    r = fun(*args, **kwargs)
+    sec = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return r, {'seconds': sec, 'peak_MB': peak / 2**20}
+
+
+class _NewPoolPerCall(fpd.AquariusClient):
+    """The behaviour before `AquariusClient`: a new connection pool for each request"""
+
+    def get(self, url: str, **kwargs):
+        return fpd.AquariusClient(self.end_point).get(url, **kwargs)
+
+
+# ===================
+# --- Benchmarks ---
+# ===================
+def bench_connection_reuse(n_site: int = 200) -> dict:
+    """A new connection pool per request (as before) vs a shared `AquariusClient`"""
+    res = {}
+    with StubAQ() as stub:
+        stub.reset()
+        t0 = time.perf_counter()
+        client = _NewPoolPerCall(stub.end_point)
+        for i in range(n_site):
+            fpd.get_ts_AQ('Flow.WMHourlyMean', f'WM{i:04d}', client=client)
+        res['new_pool_per_call'] = {
+            'seconds': time.perf_counter() - t0,
+            'requests': stub.n_request,
+            'connections': stub.n_connection,
+        }
+        stub.reset()
+        t0 = time.perf_counter()
+        with fpd.AquariusClient(stub.end_point) as client:
+            for i in range(n_site):
+                fpd.get_ts_AQ('Flow.WMHourlyMean', f'WM{i:04d}', client=client)
+        res['shared_client'] = {
+            'seconds': time.perf_counter() - t0,
+            'requests': stub.n_request,
+            'connections': stub.n_connection,
+        }
+    res['handshakes_saved'] = (
+        res['new_pool_per_call']['connections'] - res['shared_client']['connections']
+    )
+    return res
+
+
+def bench_uid_resolution(n_site: int = 500) -> dict:
+    """UniqueId requested site by site (`get_uid`) vs in bulk (`resolve_uids`)"""
+    res = {}
+    with StubAQ(n_site) as stub, fpd.AquariusClient(stub.end_point) as client:
+        sites = stub.sites
+        for name, fun in {
+            'get_uid': lambda: [fpd.get_uid('Flow.WMHourlyMean', i, client) for i in sites],
+            'resolve_uids': lambda: fpd.resolve_uids('Flow.WMHourlyMean', sites, client),
+        }.items():
+            fpd._uid_index.clear()
+            fpd._uid_index_loaded = True  # Leave the saved index out
+            stub.reset()
+            t0 = time.perf_counter()
+            fun()
+            res[name] = {'seconds': time.perf_counter() - t0, 'requests': stub.n_request}
+    fpd._uid_index.clear()
+    fpd._uid_index_loaded = False
+    return res
+
+
+def bench_chunk(n_site: int = 50, n_point: int = 24 * 90) -> dict:
+    """
+    `hourly_WU_AQ` with monthly windows (`chunk='MS'`, 8 sites x 4 windows at once) of
+    the sites indexed by 'info/uid_info.json' (without the ranges of the time series)
+    """
+    import logging
+
+    class Count(logging.Handler):
+        n = 0
+
+        def emit(self, record):
+            Count.n += 'Connection pool is full' in record.getMessage()
+
+    res = {}
+    logger = logging.getLogger('urllib3.connectionpool')
+    logger.addHandler(handler := Count())
+    with StubAQ(n_site, n_point) as stub, fpd.AquariusClient(stub.end_point) as client:
+        fpd._uid_index_loaded = True  # Leave the saved index out
+        fpd._uid_index.update(fpd.get_uid_index('Flow', client))
+        w = fpd.hourly_WU_AQ(stub.sites, max_workers=8, client=client)
+        fpd._corrected_index.clear()
+        stub.reset()
+        t0 = time.perf_counter()
+        w_chunk = fpd.hourly_WU_AQ(
+            stub.sites, max_workers=8, client=client, chunk='MS', chunk_workers=4)
+        res['chunk'] = {
+            'seconds': time.perf_counter() - t0,
+            'requests': stub.n_request,
+            'pool_full_warnings': Count.n,
+            'pool_size': client.maxsize,
+        }
+    logger.removeHandler(handler)
+    fpd._uid_index.clear()
+    fpd._corrected_index.clear()
+    fpd._uid_index_loaded = False
+    res['identical'] = bool(w.equals(w_chunk))
+    return res
+
+
+def bench_decode(n_point: int = 500_000) -> dict:
+    """Decoding the whole body (`json.loads` + `pd.json_normalize`) vs streaming"""
+    t = pd.date_range('2000-01-01 01:00', periods=n_point, freq='h')
+    data = json.dumps({'Points': [
+        {'Timestamp': f'{i}.0000000+12:00', 'Value': {'Numeric': float(v)}}
+        for v, i in enumerate(t.strftime('%Y-%m-%dT%H:%M:%S'))
+    ]}).encode('utf-8')
+
+    def whole_body():
+        r = urllib3.response.HTTPResponse(body=io.BytesIO(data))
+        ld = json.loads(r.data.decode('utf-8')).get('Points')
+        return (
+            pd.json_normalize(ld, sep='_')
+            .rename(columns={'Value_Numeric': 'Value'})
+            .astype(fpd._ts_col_dtype)
+        )
+
+    def streaming():
+        r = urllib3.response.HTTPResponse(body=io.BytesIO(data), preload_content=False)
+        return fpd._read_points(r)
+
+    res = {'body_MB': len(data) / 2**20}
+    old, res['whole_body'] = _measure(whole_body)
+    new, res['streaming'] = _measure(streaming)
+    res['identical'] = bool(old.equals(new))
+    return res
+
+
+def bench_24h_datetime(n_point: int = 175_320) -> dict:
+    """`clean_24h_datetime` row by row vs `parse_24h_datetime` (20 years, hourly)"""
+    t = pd.date_range('2000-01-01 01:00', periods=n_point, freq='h')
+    ts = pd.Series(t.strftime('%Y-%m-%dT%H:%M:%S'), name='Timestamp')
+    midnight = t.hour == 0
+    ts[midnight] = (t[midnight] - pd.Timedelta('1D')).strftime('%Y-%m-%dT24:%M:%S')
+    ts = ts + '.0000000+12:00'
+    res = {}
+    t0 = time.perf_counter()
+    old = ts.apply(fpd.clean_24h_datetime).pipe(pd.to_datetime)
+    res['clean_24h_datetime'] = {'seconds': time.perf_counter() - t0}
+    t0 = time.perf_counter()
+    new = fpd.parse_24h_datetime(ts)
+    res['parse_24h_datetime'] = {'seconds': time.perf_counter() - t0}
+    res['identical'] = bool((pd.DatetimeIndex(old) == new).all())
+    res['speed_up'] = (
+        res['clean_24h_datetime']['seconds'] / res['parse_24h_datetime']['seconds'])
+    return res
+
+
+def _synthetic_sites(n_site: int, n_point: int, seed: int = 0) -> list[pd.DataFrame]:
+    """Hourly, NaN-padded frames (one per site) starting and ending at random times"""
+    rng = np.random.default_rng(seed)
+    t = pd.date_range('2000-01-01 01:00', periods=n_point, freq='h', name='Time')
+    lst = []
+    for i in range(n_site):
+        a, b = np.sort(rng.integers(0, n_point, 2))
+        v = rng.random(b - a)
+        v[rng.random(b - a) < .05] = np.nan
+        lst.append(pd.DataFrame({f'WM{i:04d}': v}, index=t[a:b]).pipe(fpd.na_ts_insert))
+    return lst
+
+
+def bench_merge(n_sites: tuple = (10, 100, 1000), n_point: int = 8760) -> dict:
+    """`reduce(join)` vs `ts_merge` for the wide frame of the `*_WU_AQ` wrappers"""
+    res = {}
+    for n_site in n_sites:
+        lst = _synthetic_sites(n_site, n_point)
+        old, r_old = _measure(
+            lambda: reduce(lambda a, b: a.join(b, how='outer'), lst).pipe(fpd.na_ts_insert))
+        new, r_new = _measure(lambda: fpd.ts_merge(lst).pipe(fpd.na_ts_insert))
+        res[n_site] = {
+            'reduce_join': r_old, 'ts_merge': r_new, 'identical': old.equals(new)}
+    return res
+
+
+def bench_hourly_2_daily(n_site: int = 300, n_point: int = 8760) -> dict:
+    """`hourly_2_daily` site by site vs all the sites of a wide frame at once"""
+    w = fpd.ts_merge(_synthetic_sites(n_site, n_point)).pipe(fpd.na_ts_insert)
+    old, r_old = _measure(lambda: pd.concat(
+        {c: fpd.hourly_2_daily(w[[c]], 9, prop=.8)['Agg_mean'] for c in w}, axis=1))
+    new, r_new = _measure(fpd.hourly_2_daily, w, 9, prop=.8)
+    return {
+        'site_by_site': r_old,
+        'wide': r_new,
+        'identical': bool(old.reindex(new.index).equals(new)),
+    }
+
+
+def bench_ts_step(n_site: int = 300, n_point: int = 43_800) -> dict:
+    """The float `diff` of the rows left by `dropna` (as before) vs `ts_step`"""
+    w = fpd.ts_merge(_synthetic_sites(n_site, n_point))
+
+    def float_diff(ts):
+        x = ts.dropna(axis=0, how='all')
+        d = (pd.Series(x.index).diff() / np.timedelta64(1, 's')).values[1:]
+        step_minimum = d[d >= 60].min()
+        return int(step_minimum) if (d % step_minimum == 0).all() else -1
+
+    old, r_old = _measure(float_diff, w)
+    new, r_new = _measure(fpd.ts_step, w)
+    _, r_pipe = _measure(lambda: fpd.ts_info(fpd.na_ts_insert(w)))
+    return {
+        'float_diff': r_old, 'ts_step': r_new,
+        'na_ts_insert_ts_info': r_pipe, 'identical': old == new,
+    }
+
+
+def bench_polars(n_site: int = 300, n_point: int = 43_800) -> dict:
+    """The Pandas vs the Polars backend (timing, and whether the numbers are the same)"""
+    import _tools.fun_pl as fpl
+    w = fpd.ts_merge(_synthetic_sites(n_site, n_point)).pipe(fpd.na_ts_insert)
+    w_pl = fpl.from_pandas(w)
+
+    def same(a, b) -> bool:
+        if isinstance(b, int) or b is None:
+            return a == b
+        b = b.to_pandas() if b.columns[0] == 'Site' else fpl.to_pandas(b)
+        return a.shape == b.shape and bool(np.allclose(
+            a.select_dtypes('number').to_numpy(float),
+            b.select_dtypes('number').to_numpy(float),
+            equal_nan=True, rtol=1e-12,
+        ))
+
+    res = {}
+    for name, fun in {
+        'ts_step': fpd.ts_step,
+        'na_ts_insert': fpd.na_ts_insert,
+        'hourly_2_daily': lambda x, **k: fpd.hourly_2_daily(x, 9, prop=.8, **k),
+        'hourly_2_daily_single': lambda x, **k: fpd.hourly_2_daily(
+            x[:, :2] if isinstance(x, pl.DataFrame) else x.iloc[:, :1], 9, 'sum', **k),
+        'ts_info': fpd.ts_info,
+    }.items():
+        # A copy of `w` each, as a new index hasn't been checked by `_ts_valid_pd` yet
+        old, r_old = _measure(fun, w.copy())
+        new, r_new = _measure(fun, w_pl, backend='polars')
+        res[name] = {'pandas': r_old, 'polars': r_new, 'identical': same(old, new)}
+    # None of the intervals (30 seconds) reaches `minimum_time_step_in_second`
+    w_30s = w.iloc[:100].set_axis(pd.date_range('2020-01-01', periods=100, freq='30s'))
+    res['ts_step_below_minimum'] = {'identical': same(
+        fpd.ts_step(w_30s), fpd.ts_step(fpl.from_pandas(w_30s), backend='polars'))}
+    return res
+
+
+def bench_store(n_site: int = 300, n_point: int = 43_800) -> dict:
+    """The memory of the wide frame vs `SiteSeriesStore` (float64/float32) of the sites"""
+    import _tools.fun_store as fst
+    lst = _synthetic_sites(n_site, n_point)
+    w = fpd.ts_merge(lst).pipe(fpd.na_ts_insert)
+    st, r_new = _measure(fst.SiteSeriesStore.from_frames, lst)
+    st32 = st.astype('float32')
+    res = {
+        'wide_MB': w.memory_usage(index=True).sum() / 2**20,
+        'store_float64_MB': st.nbytes / 2**20,
+        'store_float32_MB': st32.nbytes / 2**20,
+        'from_frames': r_new,
+    }
+    _, res['to_frame'] = _measure(st.to_frame)
+    _, res['ts_info'] = _measure(fpd.ts_info, w)
+    _, res['store_info'] = _measure(st.info)
+    res['identical'] = bool(st.to_frame().equals(w) and st.info().equals(fpd.ts_info(w)))
+    return res
+
+
+def bench_archive(n_site: int = 300, n_point: int = 43_800) -> dict:
+    """The memory-mapped archive of `SiteSeriesStore` vs the wide frame in memory"""
+    import _tools.fun_store as fst
+    w = fpd.ts_merge(_synthetic_sites(n_site, n_point)).pipe(fpd.na_ts_insert)
+    res = {}
+    with tempfile.TemporaryDirectory() as path:
+        _, res['save'] = _measure(fst.SiteSeriesStore.from_frame(w).save, path)
+        st, res['open'] = _measure(fst.SiteSeriesStore.open, path)
+        info, res['info'] = _measure(st.info)
+        _, res['ts_info_wide'] = _measure(fpd.ts_info, w)
+        d, res['hourly_2_daily'] = _measure(
+            lambda: st.hourly_2_daily(9, prop=.8).to_frame())
+        d_old, res['hourly_2_daily_wide'] = _measure(fpd.hourly_2_daily, w, 9, prop=.8)
+        sub, res['slice'] = _measure(
+            st.to_frame, start='2001-01-01', end='2001-12-31 23:00')
+        res['identical'] = bool(
+            info.equals(fpd.ts_info(w))
+            and sub.equals(w.loc['2001-01-01':'2001-12-31 23:00'].dropna(how='all', axis=1)
+                           .reindex(columns=sub.columns))
+            and np.allclose(d, d_old, equal_nan=True, rtol=1e-12)
+        )
+        del st
+    return res
+
+
+def bench_streaming(n_site: int = 30, n_point: int = 24 * 365) -> dict:
+    """`hourly_WU_AQ` (the whole wide frame) vs `hourly_WU_AQ_iter` into a Parquet file"""
+    res = {}
+    with (
+        StubAQ(n_site, n_point) as stub,
+        fpd.AquariusClient(stub.end_point) as client,
+        tempfile.TemporaryDirectory() as path,
+    ):
+        w, res['wide'] = _measure(
+            fpd.hourly_WU_AQ, stub.sites, max_workers=4, client=client)
+        n, res['iter_to_parquet'] = _measure(
+            lambda: fpd.sites_to_parquet(
+                fpd.hourly_WU_AQ_iter(stub.sites, max_workers=4, client=client),
+                f'{path}/wu.parquet',
+            )
+        )
+        res['identical'] = bool(n == w.count().sum())
+    return res
+
+
+def bench_instrument(n_site: int = 30, n_point: int = 24 * 365) -> dict:
+    """`hourly_WU_AQ` outside vs inside `fpd.instrument()`, and the stages recorded"""
+    res, sites = {}, [f'WM{i:04d}' for i in range(n_site)]
+    fpd._uid_index.clear()
+    fpd._uid_index_loaded = True  # Leave the saved index out
+    with (
+        stub_process(n_site=n_site, n_point=n_point, gap=.05) as url,
+        fpd.AquariusClient(url) as client,
+    ):
+        fpd.hourly_WU_AQ(sites[:4], max_workers=4, client=client)  # Warm up
+        w, res['disabled'] = _measure(fpd.hourly_WU_AQ, sites, max_workers=4, client=client)
+        with fpd.instrument() as stats:
+            w_new, res['enabled'] = _measure(
+                fpd.hourly_WU_AQ, sites, max_workers=4, client=client)
+    fpd._uid_index.clear()
+    fpd._uid_index_loaded = False
+    by_stage = stats.summary()
+    res['stages'] = by_stage.to_dict(orient='index')
+    res['identical'] = bool(
+        w.equals(w_new)
+        and by_stage.loc['decode', 'points'] == w.count().sum()
+        and (stats.summary('site').drop(index='*')['calls'] > 0).sum() == n_site
+    )
+    return res
+
+
+def bench_import(repeat: int = 5, budget: float = .1) -> dict:
+    """
+    The time to import `_tools.fun_s` in a new interpreter (the best of `repeat`), vs
+    importing numpy, pandas & urllib3 too - which `fun_s` now imports on first use only
+
+    The checks 'lazy' (no heavy module imported) and 'within_budget' (`fun_s` imported
+    within `budget` seconds) fail the run if false.
+    """
+    code = """
+import json, sys, time
+t0 = time.perf_counter()
+{}
+sec = time.perf_counter() - t0
+fpd._uid_index_loaded = True
+fpd._uid_index['Flow.WMHourlyMean@WM0062'] = 'uid'
+fpd.get_uid('Flow.WMHourlyMean', 'WM0062')
+heavy = [i for i in ('numpy', 'pandas', 'urllib3') if i in sys.modules]
+print(json.dumps({{'seconds': sec, 'heavy': heavy}}))
+"""
+    env = os.environ | {'PYTHONPATH': str(Path(__file__).resolve().parents[2])}
+    res = {}
+    for name, stmt in {
+        'fun_s': 'import _tools.fun_s as fpd',
+        'fun_s_numpy_pandas_urllib3': (
+            'import numpy, pandas, urllib3\nimport _tools.fun_s as fpd'),
+    }.items():
+        runs = [
+            json.loads(subprocess.run(
+                [sys.executable, '-c', code.format(stmt)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout)
+            for _ in range(repeat)
+        ]
+        res[name] = {
+            'seconds': min(i['seconds'] for i in runs),
+            'heavy': sorted({j for i in runs for j in i['heavy']}),
+        }
+    # Nothing heavy imported by importing `fun_s` and looking up an indexed UniqueId
+    res['lazy'] = not res['fun_s']['heavy']
+    res['within_budget'] = res['fun_s']['seconds'] <= budget
+    return res
+
+
+# Run a script as '__main__', then save the peak memory (MB) of its own process, i.e. the
+# high-water mark of its address space since `exec` (`ru_maxrss` is not, as it keeps the
+# memory of the parent a child is forked from), and the largest of its workers reaped
+_PEAK_RUNNER = '''
+import json, resource, runpy, sys
+out, sys.argv = sys.argv[1], sys.argv[2:]
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+finally:
+    with open('/proc/self/status') as fi:
+        hwm = next(int(i.split()[1]) for i in fi if i.startswith('VmHWM:'))
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    with open(out, 'w') as fo:
+        json.dump({'max_rss_MB': hwm / 2**10, 'workers_max_rss_MB': workers / 2**10}, fo)
+'''
+
+
+def _run_script(script: Path, cwd: Path) -> dict:
+    """
+    Run a script of <scripts/python> in `cwd` -> {'seconds', 'max_rss_MB',
+    'workers_max_rss_MB'}, the peak memory of the script alone (Linux only)
+    """
+    env = os.environ | {'PYTHONPATH': str(Path(__file__).resolve().parents[2])}
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / 'peak.json'
+        cmd = [sys.executable, str(script)]
+        if sys.platform == 'linux':
+            cmd = [sys.executable, '-c', _PEAK_RUNNER, str(out), str(script)]
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, check=True, capture_output=True)
+        res = {'seconds': time.perf_counter() - t0}
+        if out.exists():
+            res |= json.loads(out.read_text())
+    return res
+
+
+def bench_pipeline(
+        n_sites: tuple = (10, 40),
+        n_points: tuple = (24 * 365, 24 * 365 * 4),
+        step: int = 3600,
+        gap: float = .05,
+        max_workers: int = 4,
+    ) -> dict:
+    """
+    The whole pipeline against the stub (in a child process), for each site count and
+    record length: `get_ts_AQ` (a site), `hourly_WU_AQ`, `na_ts_insert`,
+    `hourly_2_daily`, `ts_info`, and 'scripts/python/2_run_after_pwsh_script_pd.py'
+    on the CSV files of the sites (a fresh run and a run with nothing changed)
+    """
+    import _tools.fun_report as frp
+    path_root = Path(__file__).resolve().parents[2]
+    script = path_root / 'scripts' / 'python' / '2_run_after_pwsh_script_pd.py'
+    res = {}
+    fpd._uid_index.clear()
+    fpd._uid_index_loaded = True  # Leave the saved index out
+    for n_site in n_sites:
+        for n_point in n_points:
+            sites = [f'WM{i:04d}' for i in range(n_site)]
+            r = res[f'{n_site}_sites_x_{n_point}_points'] = {}
+            with (
+                stub_process(n_site=n_site, n_point=n_point, step=step, gap=gap) as url,
+                fpd.AquariusClient(url) as client,
+                tempfile.TemporaryDirectory() as path,
+            ):
+                _, r['get_ts_AQ'] = _measure(
+                    fpd.get_ts_AQ, 'Flow.WMHourlyMean', sites[0], client=client)
+                w, r['hourly_WU_AQ'] = _measure(
+                    fpd.hourly_WU_AQ, sites, max_workers=max_workers, client=client)
+                w = w.copy()  # Not the one remembered by `na_ts_insert`
+                _, r['na_ts_insert'] = _measure(fpd.na_ts_insert, w)
+                _, r['hourly_2_daily'] = _measure(fpd.hourly_2_daily, w, 9, prop=.8)
+                _, r['ts_info'] = _measure(fpd.ts_info, w.copy())
+                # The CSV files of ReportRunner, and the info files of the project
+                path = Path(path)
+                uids = [fpd.get_uid('Flow.WMHourlyMean', i, client) for i in sites]
+                frp.run_reports(
+                    uids, path_root / 'report_setting' / 'hourly_mean.json',
+                    path / 'out' / 'csv' / 'hFlo', max_workers, client,
+                )
+                shutil.copytree(path_root / 'info', path / 'info')
+                r['csv_to_parquet'] = _run_script(script, path)
+                r['csv_to_parquet_unchanged'] = _run_script(script, path)
+            r['values'] = int(w.count().sum())
+    fpd._uid_index.clear()
+    fpd._uid_index_loaded = False
+    return res
+
+
+BENCHMARKS = {
+    'import': bench_import,
+    'connection_reuse': bench_connection_reuse,
+    'uid_resolution': bench_uid_resolution,
+    'chunk': bench_chunk,
+    'decode': bench_decode,
+    '24h_datetime': bench_24h_datetime,
+    'merge': bench_merge,
+    'hourly_2_daily': bench_hourly_2_daily,
+    'ts_step': bench_ts_step,
+    'polars': bench_polars,
+    'store': bench_store,
+    'archive': bench_archive,
+    'streaming': bench_streaming,
+    'instrument': bench_instrument,
+    'pipeline': bench_pipeline,
+}
+
+
+def _json_default(o: Any) -> Any:
+    """numpy scalars (and anything else) in the results -> JSON"""
+    return o.item() if isinstance(o, np.generic) else str(o)
+
+
+def _meta() -> dict:
+    """The versions the benchmarks ran with"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'polars': pl.__version__,
+    }
+
+
+def compare(base: dict, new: dict, key: str = '') -> None:
+    """Print the ratios of the times & memory (new / base) of the same benchmarks"""
+    for k, v in new.items():
+        if k not in base:
+            continue
+        if isinstance(v, dict):
+            compare(base[k], v, f'{key}/{k}' if key else k)
+        elif k in {'seconds', 'peak_MB', 'max_rss_MB', 'workers_max_rss_MB'} and base[k]:
+            ratio = v / base[k]
+            fg = 35 if ratio > 1.1 else 32 if ratio < .9 else 39
+            print(
+                f'{key:<50} {k:>8}: {base[k]:10.4f} -> {v:10.4f} '
+                + fpd.cp(f'(x{ratio:.2f})', fg=fg)
+            )
+
+
+# The keys of the checks in the results, each of which fails the run if false
+_CHECKS = {'identical', 'lazy', 'within_budget'}
+
+
+def failed(res: dict, key: str = '') -> list[str]:
+    """The paths (such as 'merge/100/identical') of the checks in `_CHECKS` not passed"""
+    out = []
+    for k, v in res.items():
+        path = f'{key}/{k}' if key else str(k)
+        if isinstance(v, dict):
+            out += failed(v, path)
+        elif k in _CHECKS and not v:
+            out.append(path)
+    return out
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('name', nargs='*', help=f'Some of {list(BENCHMARKS)} (all if none)')
+    parser.add_argument('--out', help='Save the results as a JSON file')
+    parser.add_argument('--compare', help='A JSON file saved before, to compare with')
+    args = parser.parse_args()
+    results = {}
+    for name in (args.name or BENCHMARKS):
+        print(fpd.cp(f'\n{name}:', fg=34, display=4))
+        results[name] = BENCHMARKS[name]()
+        print(json.dumps(results[name], indent=4, default=_json_default))
+    if args.out is not None:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(
+            {'meta': _meta(), 'results': results}, indent=4, default=_json_default))
+        print(fpd.cp(f'\nSaved in <{args.out}>', fg=34))
+    if args.compare is not None:
+        base = json.loads(Path(args.compare).read_text())
+        print(fpd.cp(f"\nCompared with <{args.compare}> ({base['meta']}):", fg=34))
+        compare(base['results'], results)
+    if fails := failed(results):
+        print(fpd.cp(f'\nFailed: {fails}', fg=35))
+        sys.exit(1)